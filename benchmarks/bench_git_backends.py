@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Compare the streaming `git log` backend against the GitPython backend"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scribe.git_parser import BACKENDS, GitParser
+
+
+def time_backend(repo, backend, since, author, repeat):
+    """Return (best seconds, commit count) over `repeat` runs"""
+    best = None
+    count = 0
+    for _ in range(repeat):
+        parser = GitParser(repo, backend=backend)
+        start = time.perf_counter()
+        commits = parser.get_commits(since=since, author=author)
+        elapsed = time.perf_counter() - start
+        count = len(commits)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repo", default=".", help="Repository to benchmark")
+    parser.add_argument("--since", default="30 days ago", help="Time range passed to get_commits")
+    parser.add_argument("--author", help="Optional author filter")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per backend (best is reported)")
+    args = parser.parse_args()
+
+    results = {}
+    for backend in BACKENDS:
+        seconds, count = time_backend(args.repo, backend, args.since, args.author, args.repeat)
+        results[backend] = seconds
+        print(f"{backend:>10}: {seconds * 1000:9.1f} ms  ({count} commits)")
+
+    if results["log"] > 0:
+        print(f"\nlog backend is {results['gitpython'] / results['log']:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Time each stage of Scribe's pipeline on a synthetic repository
+
+Stages: commit extraction (per git backend), project-context inference,
+prompt formatting, response parsing, and end-to-end generation against a
+local fake chat completions server (blocking and streaming). Results are
+printed as JSON so they can be stored and compared between runs.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+sys.path.insert(0, str(HERE))
+
+from fake_openai_server import DEFAULT_RESPONSE, start_server
+from synthetic_repo import make_repo
+
+from scribe.git_parser import BACKENDS, GitParser
+from scribe.tweet_gen import TweetStreamParser
+
+
+def timed(fn, repeat):
+    """Run fn `repeat` times; return (stats dict, last result)"""
+    runs = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - start)
+    return {
+        "best_s": min(runs),
+        "mean_s": statistics.mean(runs),
+        "runs": len(runs),
+    }, result
+
+
+def bench_parsing(repeat, chunk_size=8):
+    """Parse the canned response in one go and as a stream of small chunks"""
+    def parse_whole():
+        return TweetStreamParser.parse(DEFAULT_RESPONSE)
+
+    def parse_stream():
+        parser = TweetStreamParser()
+        for i in range(0, len(DEFAULT_RESPONSE), chunk_size):
+            parser.feed(DEFAULT_RESPONSE[i:i + chunk_size])
+        parser.close()
+        return parser.tweets
+
+    whole, _ = timed(parse_whole, repeat)
+    stream, _ = timed(parse_stream, repeat)
+    return {"parse_response": whole, "parse_response_streamed": stream}
+
+
+def bench_generation(commits_text, repeat, latency, token_delay):
+    """End-to-end TweetGenerator calls against the fake server"""
+    from scribe.tweet_gen import TweetGenerator
+
+    server, base_url = start_server(latency=latency, token_delay=token_delay)
+    os.environ["SCRIBE_BASE_URL"] = base_url
+    os.environ.setdefault("DEEPSEEK_API_KEY", "benchmark")
+    try:
+        generator = TweetGenerator(provider="deepseek")
+        blocking, _ = timed(lambda: generator.generate_tweets(commits_text), repeat)
+
+        first_tweet = []
+
+        def generate_streaming():
+            start = time.perf_counter()
+            seen = []
+
+            def on_tweet(tweet):
+                if not seen:
+                    first_tweet.append(time.perf_counter() - start)
+                seen.append(tweet)
+
+            return generator.generate_tweets(commits_text, on_tweet=on_tweet)
+
+        streaming, _ = timed(generate_streaming, repeat)
+        streaming["time_to_first_tweet_best_s"] = min(first_tweet)
+        return {
+            "generate_tweets": blocking,
+            "generate_tweets_streamed": streaming,
+            "server_requests": server.requests,
+        }
+    finally:
+        server.shutdown()
+        os.environ.pop("SCRIBE_BASE_URL", None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commits", type=int, default=1000, help="Commits in the synthetic repo")
+    parser.add_argument("--files-per-commit", type=int, default=5)
+    parser.add_argument("--lines-per-file", type=int, default=20, help="Controls diff size")
+    parser.add_argument("--merge-every", type=int, default=0)
+    parser.add_argument("--repo", help="Reuse an existing repo instead of generating one")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (best and mean reported)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake server time to first byte (s)")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="Fake server delay per streamed word (s)")
+    parser.add_argument("--skip-api", action="store_true", help="Skip the fake-server generation stages")
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    results = {
+        "config": {
+            "commits": args.commits,
+            "files_per_commit": args.files_per_commit,
+            "lines_per_file": args.lines_per_file,
+            "merge_every": args.merge_every,
+            "repeat": args.repeat,
+            "latency": args.latency,
+            "token_delay": args.token_delay,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "stages": {},
+    }
+    stages = results["stages"]
+
+    with tempfile.TemporaryDirectory(prefix="scribe-bench-") as tmp:
+        repo = args.repo
+        if not repo:
+            repo = str(Path(tmp) / "repo")
+            stages["make_repo"], _ = timed(lambda: make_repo(
+                repo,
+                commits=args.commits,
+                files_per_commit=args.files_per_commit,
+                lines_per_file=args.lines_per_file,
+                merge_every=args.merge_every,
+            ), 1)
+
+        # Synthetic commits are a minute apart and end now
+        since = f"{args.commits // 1440 + 2} days ago"
+
+        commits = []
+        for backend in BACKENDS:
+            git_parser = GitParser(repo, backend=backend)
+            stages[f"get_commits[{backend}]"], commits = timed(
+                lambda: git_parser.get_commits(since=since), args.repeat
+            )
+        results["commits_found"] = len(commits)
+        results["files_seen"] = sum(len(commit["files_changed"]) for commit in commits)
+
+        stages["infer_project_context"], _ = timed(
+            lambda: GitParser._infer_project_context(commits), args.repeat
+        )
+        stages["format_commits_for_ai"], commits_text = timed(
+            lambda: GitParser.format_commits_for_ai(commits), args.repeat
+        )
+        results["prompt_chars"] = len(commits_text)
+
+        stages.update(bench_parsing(max(args.repeat, 100)))
+
+        if not args.skip_api:
+            generation = bench_generation(commits_text, args.repeat, args.latency, args.token_delay)
+            results["server_requests"] = generation.pop("server_requests")
+            stages.update(generation)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Measure how long `import scribe.cli` and `scribe --help` take, and catch import regressions"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must not be imported just to parse arguments
+DEFERRED_MODULES = ("git", "openai", "httpx", "pydantic", "dotenv")
+
+
+def run_python(args):
+    env = dict(os.environ, PYTHONPATH=str(ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    return subprocess.run(
+        [sys.executable] + args,
+        cwd=str(ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+
+def import_times():
+    """Return {module: cumulative microseconds} from `python -X importtime -c 'import scribe.cli'`"""
+    result = run_python(["-X", "importtime", "-c", "import scribe.cli"])
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def loaded_deferred_modules():
+    """Return the DEFERRED_MODULES that `import scribe.cli` pulled in"""
+    code = (
+        "import sys, scribe.cli; "
+        f"print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    result = run_python(["-c", code])
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+    return result.stdout.split()
+
+
+def help_wall_time(repeat):
+    """Best wall time in seconds for `python -m scribe.cli --help`"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run_python(["-m", "scribe.cli", "--help"])
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            raise SystemExit(result.stderr)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of `scribe --help` (best is reported)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--max-import-ms", type=float, help="Fail if `import scribe.cli` takes longer")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    times = import_times()
+    total_ms = times.get("scribe.cli", 0) / 1000
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    deferred = loaded_deferred_modules()
+    help_ms = help_wall_time(args.repeat) * 1000
+
+    if args.json:
+        print(json.dumps({
+            "import_scribe_cli_ms": total_ms,
+            "help_wall_ms": help_ms,
+            "eager_heavy_modules": deferred,
+            "slowest_imports_ms": {module: us / 1000 for module, us in slowest},
+        }, indent=2))
+    else:
+        print(f"import scribe.cli: {total_ms:7.1f} ms")
+        print(f"scribe --help:     {help_ms:7.1f} ms (best of {args.repeat}, incl. interpreter startup)")
+        print("\nSlowest imports (cumulative):")
+        for module, us in slowest:
+            print(f"  {us / 1000:7.1f} ms  {module}")
+
+    failed = False
+    if deferred:
+        print(f"\n❌ Heavy modules imported eagerly: {', '.join(deferred)}", file=sys.stderr)
+        failed = True
+    if args.max_import_ms is not None and total_ms > args.max_import_ms:
+        print(f"\n❌ import scribe.cli took {total_ms:.1f} ms (limit {args.max_import_ms} ms)", file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
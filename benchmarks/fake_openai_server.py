@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Local stand-in for an OpenAI-compatible chat completions API, for benchmarks"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Scribe asks for JSON output ({"tweets": [...]})
+DEFAULT_RESPONSE = json.dumps({"tweets": [
+    f"Building a tool that turns commits into posts. Shipped option {i} today - "
+    f"faster parsing, smarter prompts and fewer wasted tokens. Next up: more polish 🚀"
+    for i in range(1, 4)
+]}, ensure_ascii=False)
+
+
+class FakeChatHandler(BaseHTTPRequestHandler):
+    """
+    Answers POST .../chat/completions with a canned response
+
+    Latency, per-word delay and the response text live on the server object
+    (see make_server) so every handler thread shares them.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        server.requests += 1
+
+        time.sleep(server.latency)
+        if request.get("stream"):
+            self._stream(request, server)
+        else:
+            self._complete(request, server)
+
+    def _usage(self, request, server):
+        messages = request.get("messages", [])
+        prompt_chars = sum(len(m.get("content", "")) for m in messages)
+        # Mimic prompt caching: a system prompt seen before counts as cached
+        system = messages[0].get("content", "") if messages and messages[0].get("role") == "system" else ""
+        with server.lock:
+            cached = len(system) // 4 if system in server.seen_prefixes else 0
+            server.seen_prefixes.add(system)
+        return {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(server.response_text) // 4,
+            "total_tokens": prompt_chars // 4 + len(server.response_text) // 4,
+            "prompt_tokens_details": {"cached_tokens": cached},
+        }
+
+    def _complete(self, request, server):
+        time.sleep(server.token_delay * len(server.response_text.split()))
+        body = json.dumps({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": server.response_text},
+                "finish_reason": "stop",
+            }],
+            "usage": self._usage(request, server),
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, request, server):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def send(payload):
+            self.wfile.write(f"data: {payload}\n\n".encode())
+            self.wfile.flush()
+
+        # One chunk per word, keeping the whitespace that follows it
+        words = server.response_text.split(" ")
+        for i, word in enumerate(words):
+            delta = word if i == len(words) - 1 else word + " "
+            send(json.dumps({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+            }))
+            time.sleep(server.token_delay)
+        send(json.dumps({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            send(json.dumps({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [],
+                "usage": self._usage(request, server),
+            }))
+        send("[DONE]")
+        self.close_connection = True
+
+
+def make_server(host="127.0.0.1", port=0, latency=0.0, token_delay=0.0, response_text=DEFAULT_RESPONSE):
+    """Create (but don't start) a fake server; port 0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), FakeChatHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.token_delay = token_delay
+    server.response_text = response_text
+    server.requests = 0
+    server.seen_prefixes = set()
+    server.lock = threading.Lock()
+    return server
+
+
+def start_server(**kwargs):
+    """Start a fake server on a background thread and return (server, base_url)"""
+    server = make_server(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first byte")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Seconds per streamed word")
+    args = parser.parse_args()
+
+    server = make_server(port=args.port, latency=args.latency, token_delay=args.token_delay)
+    print(f"Fake chat completions API on http://127.0.0.1:{args.port}/v1")
+    print(f"Point Scribe at it with SCRIBE_BASE_URL=http://127.0.0.1:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
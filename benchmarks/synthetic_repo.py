@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Generate synthetic git repositories of a given size with `git fast-import`"""
+import argparse
+import random
+import subprocess
+import time
+from pathlib import Path
+
+DIRECTORIES = ["src", "src/components", "src/api", "app", "pages", "lib/db", "docker", "tests", "vendor/lib"]
+EXTENSIONS = [".py", ".ts", ".tsx", ".js", ".md", ".json", ".sql"]
+MESSAGES = [
+    "Add {} support", "Fix {} edge case", "Refactor {} module", "wip", "fix typo",
+    "lint", "address review on {}", "Speed up {}", "Document {}",
+]
+TOPICS = ["auth", "billing", "search", "export", "onboarding", "cache", "sync", "dashboard"]
+
+
+def _file_content(rng, lines):
+    return "".join(f"line {rng.randrange(10 ** 6)} {rng.choice(TOPICS)}\n" for _ in range(lines))
+
+
+def make_repo(path, commits=1000, files_per_commit=5, lines_per_file=20, authors=3,
+              merge_every=0, seed=0, start=None):
+    """
+    Create a repository at `path` with `commits` commits
+
+    Args:
+        path: Directory to create (must not exist or be empty)
+        commits: Number of commits on the main line
+        files_per_commit: Files added or rewritten per commit
+        lines_per_file: Lines written per file (controls diff size)
+        authors: Number of distinct authors to rotate through
+        merge_every: Add a merge of a side-branch commit every N commits (0 = never)
+        seed: Random seed, so runs are reproducible
+        start: Unix timestamp of the first commit (default: commits spaced one
+            minute apart ending now, so they all fall inside "today"-ish ranges)
+
+    Returns:
+        The repository path
+    """
+    rng = random.Random(seed)
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    subprocess.run(["git", "init", "-q", "-b", "main", str(path)], check=True)
+
+    now = int(time.time())
+    start = start if start is not None else now - commits * 60
+    known_files = []
+    lines = []
+
+    def commit(mark, ref, timestamp, message, parents, files):
+        name = f"Dev {mark % authors}"
+        lines.append(f"commit {ref}")
+        lines.append(f"mark :{mark}")
+        lines.append(f"author {name} <dev{mark % authors}@example.com> {timestamp} +0000")
+        lines.append(f"committer {name} <dev{mark % authors}@example.com> {timestamp} +0000")
+        data = message.encode()
+        lines.append(f"data {len(data)}")
+        lines.append(message)
+        for i, parent in enumerate(parents):
+            lines.append(f"{'from' if i == 0 else 'merge'} :{parent}")
+        for file_path, content in files:
+            data = content.encode()
+            lines.append(f"M 100644 inline {file_path}")
+            lines.append(f"data {len(data)}")
+            lines.append(content)
+
+    previous = None
+    mark = 0
+    for i in range(commits):
+        files = []
+        for _ in range(files_per_commit):
+            if known_files and rng.random() < 0.5:
+                file_path = rng.choice(known_files)
+            else:
+                file_path = f"{rng.choice(DIRECTORIES)}/file{len(known_files)}{rng.choice(EXTENSIONS)}"
+                known_files.append(file_path)
+            files.append((file_path, _file_content(rng, lines_per_file)))
+
+        message = rng.choice(MESSAGES).format(rng.choice(TOPICS))
+        timestamp = start + i * 60
+        mark += 1
+        parents = [previous] if previous else []
+
+        if merge_every and previous and i % merge_every == 0:
+            # Side commit off the previous commit, then merge it back in
+            commit(mark, "refs/heads/side", timestamp, f"Side work on {rng.choice(TOPICS)}", [previous], files[:1])
+            side = mark
+            mark += 1
+            commit(mark, "refs/heads/main", timestamp, "Merge branch 'side'", [previous, side], files[1:])
+        else:
+            commit(mark, "refs/heads/main", timestamp, message, parents, files)
+        previous = mark
+
+    stream = ("\n".join(lines) + "\n").encode()
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=str(path), input=stream, check=True)
+    subprocess.run(["git", "checkout", "-q", "-f", "main"], cwd=str(path), check=True)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", help="Directory for the new repository")
+    parser.add_argument("--commits", type=int, default=1000)
+    parser.add_argument("--files-per-commit", type=int, default=5)
+    parser.add_argument("--lines-per-file", type=int, default=20)
+    parser.add_argument("--authors", type=int, default=3)
+    parser.add_argument("--merge-every", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    make_repo(
+        args.path,
+        commits=args.commits,
+        files_per_commit=args.files_per_commit,
+        lines_per_file=args.lines_per_file,
+        authors=args.authors,
+        merge_every=args.merge_every,
+        seed=args.seed,
+    )
+    print(f"Created {args.path} with {args.commits} commits in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from .records import CommitDigest
+
+BUCKETS = ("day", "week")
+
+
+def bucket_start(date, bucket="day"):
+    """Return the first day of the bucket a commit date falls in (weeks start on Monday)"""
+    day = date.date()
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "day":
+        return day
+    raise ValueError(f"Unknown bucket: {bucket}")
+
+
+def bucket_end(start, bucket="day"):
+    """Return the last day of the bucket starting on `start`"""
+    return start + timedelta(days=6 if bucket == "week" else 0)
+
+
+def bucket_commits(records, bucket="day", keep_files=8):
+    """
+    Fold a commit stream into one CommitDigest per time bucket
+
+    Commits are read once and each lands in the bucket of its commit date,
+    so a whole sprint can be split up without walking history per day.
+
+    Args:
+        records: CommitRecord stream, e.g. GitParser.iter_commits()
+        bucket: "day" or "week"
+        keep_files: Files kept per commit, as in CommitDigest
+
+    Returns:
+        List of (bucket start date, CommitDigest) pairs, oldest bucket first;
+        buckets without commits are left out
+    """
+    digests = {}
+    for record in records:
+        start = bucket_start(record.date, bucket)
+        digest = digests.get(start)
+        if digest is None:
+            digest = digests[start] = CommitDigest(keep_files=keep_files)
+        digest.add(record)
+    return sorted(digests.items())
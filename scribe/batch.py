@@ -0,0 +1,117 @@
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+from .git_parser import GitParser
+from .metrics import Metrics
+
+
+def find_repos(workspace):
+    """Return the git repositories directly inside `workspace` (or the workspace itself)"""
+    root = Path(workspace).expanduser()
+    if not root.is_dir():
+        raise ValueError(f"Not a directory: {workspace}")
+    if (root / ".git").exists():
+        return [str(root)]
+
+    repos = sorted(str(path) for path in root.iterdir() if path.is_dir() and (path / ".git").exists())
+    if not repos:
+        raise ValueError(f"No git repositories found in {workspace}")
+    return repos
+
+
+def unique_repo_names(paths):
+    """
+    Name each repository by its directory, adding parent directories where names clash
+
+    ["~/a/app", "~/b/app", "~/api"] gives ["a/app", "b/app", "api"].
+    """
+    parts = [Path(path).parts for path in paths]
+    depths = [1] * len(paths)
+    while True:
+        names = [Path(*path_parts[-depth:]).as_posix() for path_parts, depth in zip(parts, depths)]
+        counts = Counter(names)
+        clashing = [
+            i for i, name in enumerate(names)
+            if counts[name] > 1 and depths[i] < len(parts[i])
+        ]
+        if not clashing:
+            return names
+        for i in clashing:
+            depths[i] += 1
+
+
+def _extract_repo(repo_path, since, author, backend, cache, rebuild_cache=False, filters=None):
+    """Worker: read one repository's commits (extract_repos names and tags them)"""
+    start = time.perf_counter()
+    metrics = Metrics()
+    with metrics.phase("repo_open"):
+        parser = GitParser(repo_path, backend=backend, cache=cache, metrics=metrics)
+    if rebuild_cache and parser.cache is not None:
+        parser.cache.clear()
+    with metrics.phase("commit_iteration"):
+        commits = parser.get_commits(since=since, author=author, **(filters or {}))
+
+    result = {
+        "path": parser.repo.working_dir,
+        "commits": commits,
+        "git_dir": parser.repo.git_dir,
+        "position": parser.position,
+        "watermark": parser.watermark,
+        "seconds": time.perf_counter() - start,
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "metrics": metrics.to_dict(),
+    }
+    if parser.cache is not None:
+        result["cache_hits"] = parser.cache.hits
+        result["cache_misses"] = parser.cache.misses
+        parser.cache.close()
+    return result
+
+
+def extract_repos(repo_paths, since="today", author=None, backend="log", cache=False,
+                  rebuild_cache=False, filters=None, max_workers=None):
+    """
+    Extract commits from several repositories in parallel worker processes
+
+    Args:
+        repo_paths: Repository paths
+        since: Time range passed to GitParser.get_commits
+        author: Filter by author name (optional)
+        backend: GitParser backend
+        cache: Use each repo's commit metadata cache
+        rebuild_cache: Clear each repo's cache before reading
+        filters: Extra GitParser.get_commits filters (paths, no_merges, branches, ...)
+        max_workers: Process pool size (default: one per repo, capped at CPU count)
+
+    Returns:
+        List of per-repo results (repo, path, commits, seconds, cache counters,
+        phase metrics, and the HEAD position walked, for saving "last-run" watermarks)
+        in the same order as `repo_paths`. "repo" names are unique (see
+        unique_repo_names) and every commit is tagged with its repo's name.
+    """
+    if len(repo_paths) == 1:
+        results = [_extract_repo(repo_paths[0], since, author, backend, cache, rebuild_cache, filters)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        max_workers = max_workers or min(len(repo_paths), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(_extract_repo, path, since, author, backend, cache, rebuild_cache, filters)
+                for path in repo_paths
+            ]
+            results = [future.result() for future in futures]
+
+    for result, name in zip(results, unique_repo_names([result["path"] for result in results])):
+        result["repo"] = name
+        for commit in result["commits"]:
+            commit["repo"] = name
+    return results
+
+
+def merge_commits(results):
+    """Flatten per-repo results into one commit list, grouped by repo"""
+    return [commit for result in results for commit in result["commits"]]
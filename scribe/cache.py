@@ -0,0 +1,174 @@
+import hashlib
+import json
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .config import get_cache_dir, get_commit_cache_limits, get_response_cache_limits
+
+
+class CommitCache:
+    """SQLite store mapping full commit SHAs to their commit_data records"""
+
+    def __init__(self, path, max_entries=None, max_age_days=None):
+        default_entries, default_age = get_commit_cache_limits()
+        self.max_entries = default_entries if max_entries is None else max_entries
+        self.max_age_days = default_age if max_age_days is None else max_age_days
+        self.hits = 0
+        self.misses = 0
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # `scribe serve` reuses a repo's cache from one request thread at a time
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS commits (
+                sha TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS commits_accessed ON commits (accessed_at)")
+        self.conn.commit()
+
+    def get_many(self, shas):
+        """Return {sha: commit_data} for every cached SHA and count hits/misses"""
+        found = {}
+        shas = list(shas)
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(shas), 500):
+            batch = shas[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT sha, data FROM commits WHERE sha IN ({placeholders})", batch
+            )
+            for sha, data in rows:
+                found[sha] = self._decode(data)
+
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE commits SET accessed_at = ? WHERE sha = ?",
+                [(now, sha) for sha in found],
+            )
+            self.conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(shas) - len(found)
+        return found
+
+    def put_many(self, commits):
+        """Store commit_data records and evict anything past the limits"""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO commits (sha, data, accessed_at) VALUES (?, ?, ?)",
+            [(commit["sha"], self._encode(commit), now) for commit in commits],
+        )
+        self.conn.commit()
+        self.evict()
+
+    def evict(self):
+        """Drop entries unused for max_age_days, then the least recently used past max_entries"""
+        cutoff = time.time() - self.max_age_days * 86400
+        self.conn.execute("DELETE FROM commits WHERE accessed_at < ?", (cutoff,))
+        self.conn.execute(
+            """DELETE FROM commits WHERE sha IN (
+                SELECT sha FROM commits ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.max_entries,),
+        )
+        self.conn.commit()
+
+    def clear(self):
+        """Remove every cached commit"""
+        self.conn.execute("DELETE FROM commits")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _encode(commit):
+        record = dict(commit)
+        record["date"] = commit["date"].isoformat()
+        return json.dumps(record)
+
+    @staticmethod
+    def _decode(data):
+        record = json.loads(data)
+        record["date"] = datetime.fromisoformat(record["date"])
+        return record
+
+
+class ResponseCache:
+    """Content-addressed store of LLM completions with TTL and LRU eviction"""
+
+    def __init__(self, path=None, ttl=None, max_entries=None):
+        default_ttl, default_entries = get_response_cache_limits()
+        self.ttl = default_ttl if ttl is None else ttl
+        self.max_entries = default_entries if max_entries is None else max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self.path = Path(path) if path else get_cache_dir() / "responses.sqlite3"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(**request):
+        """Hash everything that affects the completion (model, messages, sampling params)"""
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached response text, or None if missing or expired"""
+        row = self.conn.execute(
+            "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.ttl:
+            self.misses += 1
+            return None
+
+        self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self.hits += 1
+        return row[0]
+
+    def put(self, key, response):
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, response, now, now),
+        )
+        self.conn.commit()
+        self.evict()
+
+    def evict(self):
+        """Drop expired responses, then the least recently used past max_entries"""
+        self.conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        self.conn.execute(
+            """DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.max_entries,),
+        )
+        self.conn.commit()
+
+    def clear(self):
+        self.conn.execute("DELETE FROM responses")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -1,20 +1,35 @@
 #!/usr/bin/env python3
 import argparse
+import json
 import sys
 import threading
-import time
 from pathlib import Path
-from .git_parser import GitParser
-from .tweet_gen import TweetGenerator
+from .backfill import BUCKETS, bucket_commits, bucket_end
+from .batch import extract_repos, find_repos, merge_commits
+from .collapse import collapse_commits
+from .config import get_chunk_token_budget, get_collapse_threshold, get_diff_budgets
+from .diffs import add_diff_excerpts
+from .git_parser import LAST_RUN, GitParser
+from .metrics import Metrics
+from .precompute import install_hook, is_running, uninstall_hook, wait_for_precompute
+from .records import CommitDigest, CommitRecord
+from .summarize import build_commits_text
+from .tweet_gen import STYLES, TweetGenerator
+from .watermark import WatermarkStore
 
 
 class Spinner:
     """Simple CLI spinner for showing progress"""
+    # Turned off by `scribe serve`, whose output goes to clients, not a terminal
+    enabled = True
+
     def __init__(self, message="Loading"):
         self.spinner_chars = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
         self.message = message
         self.running = False
         self.thread = None
+        # Set by stop() so a cached result isn't held up by the frame delay
+        self.stopped = threading.Event()
 
     def _spin(self):
         idx = 0
@@ -22,59 +37,241 @@ class Spinner:
             sys.stdout.write(f"\r{self.spinner_chars[idx]} {self.message}")
             sys.stdout.flush()
             idx = (idx + 1) % len(self.spinner_chars)
-            time.sleep(0.1)
+            self.stopped.wait(0.1)
         sys.stdout.write("\r" + " " * (len(self.message) + 3) + "\r")
         sys.stdout.flush()
 
     def start(self):
+        if not self.enabled:
+            return
         self.running = True
+        self.stopped.clear()
         self.thread = threading.Thread(target=self._spin)
         self.thread.start()
 
     def stop(self):
         self.running = False
+        self.stopped.set()
         if self.thread:
             self.thread.join()
 
 
-def main():
+def save_watermarks(positions, author):
+    """After a successful run, remember each repo's walked HEAD for --since last-run"""
+    for git_dir, position in positions:
+        if position["tips"]:
+            WatermarkStore.for_git_dir(git_dir).set(position["branch"], author, position["tips"], position["date"])
+
+
+def print_token_usage(generator):
+    """Show the tokens the provider reported, including those served from its prompt cache"""
+    usage = generator.metrics.usage
+    if usage["requests"]:
+        print(f"🧾 {usage['prompt_tokens']} prompt tokens ({usage['cached_tokens']} cached by {generator.provider}), "
+              f"{usage['completion_tokens']} completion tokens")
+
+
+def generate_concurrently(args, generator, commits_text):
+    """Generate several styles and/or a thread at once and print each set"""
+    if args.thread:
+        styles = []
+    elif args.style == "all":
+        styles = list(STYLES)
+    else:
+        styles = [args.style]
+    thread = args.thread or args.with_thread
+
+    spinner = Spinner(f"🤖 Generating {len(styles) + thread} sets concurrently using {args.provider}...")
+    spinner.start()
+    try:
+        results = generator.generate_many(
+            commits_text,
+            styles=styles,
+            num_options=args.options,
+            thread=thread,
+            max_concurrency=args.concurrency
+        )
+    finally:
+        spinner.stop()
+
+    for label, tweets in results.items():
+        if label == "thread":
+            print("📝 Tweet Thread:\n")
+        else:
+            print(f"📝 Tweet Options ({label} style):\n")
+        for i, tweet in enumerate(tweets, 1):
+            print(f"{i}. {tweet}\n")
+
+    print_token_usage(generator)
+    if generator.cache is not None and generator.cache.hits:
+        print("💾 Reused cached responses (pass --fresh to regenerate)")
+    print("✨ Copy and paste your favorite!")
+
+
+def add_filter_arguments(parser):
+    """Commit filters shared by every command that reads history"""
+    parser.add_argument(
+        "--author",
+        help="Filter commits by author name"
+    )
+
+    parser.add_argument(
+        "--path",
+        action="append",
+        help="Only commits touching this path (git pathspec). Repeatable"
+    )
+
+    parser.add_argument(
+        "--exclude-path",
+        action="append",
+        help="Ignore commits that only touch this path (git pathspec). Repeatable"
+    )
+
+    parser.add_argument(
+        "--no-merges",
+        action="store_true",
+        help="Skip merge commits"
+    )
+
+    branch_group = parser.add_mutually_exclusive_group()
+    branch_group.add_argument(
+        "--branch",
+        action="append",
+        help="Walk this branch instead of the current one. Repeatable; shared commits are listed once"
+    )
+    branch_group.add_argument(
+        "--all",
+        dest="all_branches",
+        action="store_true",
+        help="Walk every branch and tag"
+    )
+
+
+def add_collapse_arguments(parser):
+    """Near-duplicate commit folding, shared by every command that builds prompts"""
+    collapse_group = parser.add_mutually_exclusive_group()
+    collapse_group.add_argument(
+        "--collapse-threshold",
+        type=float,
+        help="Message similarity (0-1) at which near-duplicate commits like \"wip\" or \"fix typo\" "
+             "are folded into one prompt entry (default: 0.7, or SCRIBE_COLLAPSE_THRESHOLD)"
+    )
+    collapse_group.add_argument(
+        "--no-collapse",
+        action="store_true",
+        help="List every commit in the prompt, even near-duplicates"
+    )
+
+
+def collapse_for_prompt(args, commits):
+    """Fold near-duplicate commits unless --no-collapse was given"""
+    if args.no_collapse:
+        return commits
+    threshold = args.collapse_threshold
+    if threshold is None:
+        threshold = get_collapse_threshold()
+    return collapse_commits(commits, threshold)
+
+
+def add_diff_arguments(parser):
+    """Opt-in diff excerpts, shared by every command that builds prompts"""
+    parser.add_argument(
+        "--with-diffs",
+        action="store_true",
+        help="Add the most significant hunks of each commit's diff to the prompt "
+             "(skips lock, vendored and generated files)"
+    )
+
+    parser.add_argument(
+        "--diff-budget",
+        type=int,
+        metavar="TOKENS",
+        help="Token budget for all diff excerpts together (default: 2000, or SCRIBE_DIFF_RUN_TOKENS; "
+             "per commit: SCRIBE_DIFF_COMMIT_TOKENS, default 300)"
+    )
+
+
+def add_diffs_for_prompt(args, commits, repo_paths):
+    """Attach diff excerpts within the configured budgets, returning the bytes added"""
+    commit_tokens, run_tokens = get_diff_budgets()
+    if args.diff_budget is not None:
+        run_tokens = args.diff_budget
+    return add_diff_excerpts(commits, repo_paths, commit_tokens, run_tokens)
+
+
+def filters_from_args(args):
+    """GitParser filters from the arguments added by add_filter_arguments"""
+    return {
+        "paths": args.path,
+        "exclude_paths": args.exclude_path,
+        "no_merges": args.no_merges,
+        "branches": args.branch,
+        "all_branches": args.all_branches,
+    }
+
+
+def build_parser():
+    """Argument parser for the main `scribe` command"""
     parser = argparse.ArgumentParser(
+        prog="scribe",
         description="Scribe - Turn your git commits into tweets",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   scribe                                    # Generate tweets from today's commits
   scribe --since "2 days ago"               # Commits from last 2 days
+  scribe --since last-run                   # Only commits since the previous run
   scribe --style casual                     # Use casual tone
   scribe --author "meesh"                   # Filter by author
+  scribe --path src/ --no-merges            # Only non-merge commits touching src/
+  scribe --all --since "7 days ago"         # Commits on every branch
   scribe --repo ../other-project            # Analyze different repo
+  scribe --repo ../api --repo ../web        # Combine several repos
+  scribe --workspace ~/projects             # Every repo in a directory
   scribe --thread                           # Generate a tweet thread
+  scribe --style all --with-thread          # Every style plus a thread, concurrently
   scribe --provider openai                  # Use OpenAI instead of DeepSeek
+  scribe --profile --metrics-json run.json  # Time each phase and save the numbers
+
+Commands:
+  scribe backfill --from 2024-05-01 --to 2024-05-14 --bucket day > posts.jsonl
+                                            # One post per day of a past sprint
+  scribe install-hook                       # Pre-generate tweets after every commit
+  scribe serve                              # Keep a warm server for SCRIBE_SERVER clients
         """
     )
 
     parser.add_argument(
         "--repo",
-        default=".",
-        help="Path to git repository (default: current directory)"
+        action="append",
+        help="Path to git repository (default: current directory). Repeat to combine several repos"
     )
 
     parser.add_argument(
-        "--since",
-        default="today",
-        help='Time range for commits (default: "today"). Examples: "yesterday", "2 days ago", "3 hours ago", "2024-01-01"'
+        "--workspace",
+        help="Directory whose git repositories are all analyzed together"
     )
 
     parser.add_argument(
-        "--author",
-        help="Filter commits by author name"
+        "--jobs",
+        type=int,
+        help="Worker processes for multi-repo extraction (default: one per repo, up to CPU count)"
     )
 
+    parser.add_argument(
+        "--since",
+        default="today",
+        help='Time range for commits (default: "today"). Examples: "yesterday", "2 days ago", "3 hours ago", "2024-01-01", '
+             '"last-run" (only commits since the last successful run on this branch)'
+    )
+
+    add_filter_arguments(parser)
+
     parser.add_argument(
         "--style",
-        choices=["technical", "casual", "celebratory"],
+        choices=list(STYLES) + ["all"],
         default="technical",
-        help="Tweet style (default: technical)"
+        help='Tweet style, or "all" to generate every style concurrently (default: technical)'
     )
 
     parser.add_argument(
@@ -90,6 +287,29 @@ Examples:
         help="Generate a tweet thread instead of single tweets"
     )
 
+    parser.add_argument(
+        "--with-thread",
+        action="store_true",
+        help="Generate a tweet thread alongside the tweet options, concurrently"
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum concurrent AI requests for --style all, --with-thread and chunk summaries (default: 4)"
+    )
+
+    parser.add_argument(
+        "--chunk-budget",
+        type=int,
+        help="Approximate token budget for the commits prompt; larger histories are summarized in chunks first (default: 6000, or SCRIBE_CHUNK_TOKEN_BUDGET)"
+    )
+
+    add_collapse_arguments(parser)
+
+    add_diff_arguments(parser)
+
     parser.add_argument(
         "--provider",
         choices=["deepseek", "openai"],
@@ -97,14 +317,174 @@ Examples:
         help="AI provider to use (default: deepseek)"
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--git-backend",
+        choices=["log", "gitpython"],
+        default="log",
+        help="How commits are read: one streamed `git log` (log) or per-commit GitPython diffs (default: log)"
+    )
+
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the commit metadata or response caches"
+    )
+    cache_group.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="Clear the commit metadata cache for this repo and rebuild it"
+    )
+
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Wait for the full response instead of printing tweets as they arrive"
+    )
+
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Always call the AI provider instead of reusing a cached response"
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-phase timings, counts and token usage when the run finishes"
+    )
+
+    parser.add_argument(
+        "--metrics-json",
+        metavar="PATH",
+        help="Write per-phase timings, counts and token usage to PATH as JSON"
+    )
+
+    parser.add_argument(
+        "--cprofile",
+        metavar="PATH",
+        help="Run under cProfile and dump the stats to PATH (read with `python -m pstats PATH`)"
+    )
+
+    # Set by the post-commit hook's background job (see scribe.precompute)
+    parser.add_argument("--precompute", action="store_true", help=argparse.SUPPRESS)
+
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    args = build_parser().parse_args(argv)
+    execute(args)
+
+
+def execute(args, pool=None):
+    """Run parsed `scribe` arguments, handling --profile, --metrics-json and --cprofile"""
+    metrics = Metrics()
+
+    profiler = None
+    if args.cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        run(args, metrics, pool)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+        if args.profile:
+            print(f"\n{metrics.report()}", file=sys.stderr)
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json)
+
+
+def run(args, metrics, pool=None):
+    """
+    Run one CLI invocation, recording phase timings into `metrics`
+
+    `pool` is the daemon's WarmPool (see scribe.server); without it the
+    repository and AI client are opened for this run only.
+    """
+    filters = filters_from_args(args)
+    if args.chunk_budget is None:
+        args.chunk_budget = get_chunk_token_budget()
 
     try:
         # Parse git commits
-        print(f"🔍 Analyzing commits in {args.repo}...")
-        parser_obj = GitParser(args.repo)
-        commits = parser_obj.get_commits(since=args.since, author=args.author)
+        repo_paths = list(args.repo or [])
+        if args.workspace:
+            repo_paths.extend(find_repos(args.workspace))
+        if not repo_paths:
+            repo_paths = ["."]
+        multi_repo = len(repo_paths) > 1
+
+        if multi_repo:
+            print(f"🔍 Analyzing commits in {len(repo_paths)} repositories...")
+            with metrics.phase("extract_repos"):
+                results = extract_repos(
+                    repo_paths,
+                    since=args.since,
+                    author=args.author,
+                    backend=args.git_backend,
+                    cache=not args.no_cache,
+                    rebuild_cache=args.rebuild_cache,
+                    filters=filters,
+                    max_workers=args.jobs
+                )
+            for result in results:
+                # Worker phases are summed across repos, so they can exceed extract_repos
+                metrics.merge(result["metrics"])
+                print(f"   📁 {result['repo']}: {len(result['commits'])} commit(s) in {result['seconds']:.2f}s")
+                if args.since == LAST_RUN and result["watermark"] is None:
+                    print(f"      (no previous run recorded for {result['repo']}; using today's commits)")
+            positions = [(result["git_dir"], result["position"]) for result in results]
+            repo_paths_by_name = {result["repo"]: result["path"] for result in results}
+            if not args.no_cache:
+                hits = sum(result["cache_hits"] for result in results)
+                misses = sum(result["cache_misses"] for result in results)
+                print(f"💾 Commit cache: {hits} hit(s), {misses} miss(es)")
+            digest = CommitDigest().extend(
+                CommitRecord.from_dict(commit_data) for commit_data in merge_commits(results)
+            )
+        else:
+            print(f"🔍 Analyzing commits in {repo_paths[0]}...")
+            with metrics.phase("repo_open"):
+                if pool is None:
+                    parser_obj = GitParser(repo_paths[0], backend=args.git_backend, cache=not args.no_cache, metrics=metrics)
+                else:
+                    parser_obj = pool.git_parser(repo_paths[0], backend=args.git_backend, cache=not args.no_cache, metrics=metrics)
+            if args.rebuild_cache:
+                parser_obj.cache.clear()
+            if not (args.precompute or args.no_cache or args.fresh) and is_running(parser_obj.repo.git_dir):
+                # The post-commit job is filling the caches this run would otherwise redo
+                print("⏳ Waiting for the background pre-generation to finish...")
+                wait_for_precompute(parser_obj.repo.git_dir)
+            # Fold over the commit stream once; only trimmed records are kept
+            with metrics.phase("commit_iteration"):
+                digest = CommitDigest().extend(parser_obj.iter_commits(since=args.since, author=args.author, **filters))
+            positions = [(parser_obj.repo.git_dir, parser_obj.position)]
+            repo_paths_by_name = {None: parser_obj.repo.working_dir}
+            if args.since == LAST_RUN:
+                if parser_obj.watermark is None:
+                    print("   (no previous run recorded for this branch; using today's commits)")
+                else:
+                    print(f"   Since last run at {parser_obj.watermark['sha'][:7]} ({parser_obj.watermark['date']})")
+            if parser_obj.cache is not None:
+                print(f"💾 Commit cache: {parser_obj.cache.hits} hit(s), {parser_obj.cache.misses} miss(es)")
+            if pool is not None:
+                # Done with the repository; another request can use it while this one generates
+                pool.release()
 
+        commits = digest.records
+        metrics.count("commits", len(commits))
+        metrics.count("files", digest.files)
+        metrics.count("insertions", digest.insertions)
+        metrics.count("deletions", digest.deletions)
         if not commits:
             print(f"\n❌ No commits found for the specified criteria.")
             print(f"   Time range: {args.since}")
@@ -114,48 +494,108 @@ Examples:
             sys.exit(1)
 
         # Show commit summary
-        print(f"\n✅ Found {len(commits)} commit(s)")
+        print(f"\n✅ Found {len(commits)} commit(s) (+{digest.insertions} -{digest.deletions})")
         for i, commit in enumerate(commits, 1):
-            print(f"   {i}. {commit['message'][:60]}{'...' if len(commit['message']) > 60 else ''}")
+            prefix = f"[{commit['repo']}] " if multi_repo else ""
+            print(f"   {i}. {prefix}{commit['message'][:60]}{'...' if len(commit['message']) > 60 else ''}")
+
+        with metrics.phase("client_init"):
+            if pool is None:
+                generator = TweetGenerator(provider=args.provider, cache=not args.no_cache, fresh=args.fresh, metrics=metrics)
+            else:
+                generator = pool.tweet_generator(provider=args.provider, cache=not args.no_cache, fresh=args.fresh, metrics=metrics)
 
-        # Format for AI
-        commits_text = parser_obj.format_commits_for_ai(commits)
+        with metrics.phase("collapse"):
+            prompt_commits = collapse_for_prompt(args, commits)
+        if len(prompt_commits) < len(commits):
+            print(f"🧹 Folded near-duplicate commits: {len(commits)} → {len(prompt_commits)} prompt entries")
+        metrics.count("prompt_commits", len(prompt_commits))
+
+        if args.with_diffs:
+            with metrics.phase("diff_excerpts"):
+                diff_bytes = add_diffs_for_prompt(args, prompt_commits, repo_paths_by_name)
+            metrics.count("diff_bytes", diff_bytes)
+            with_diffs = sum(1 for commit in prompt_commits if commit.get("diff"))
+            print(f"🔬 Added diff excerpts to {with_diffs} commit(s) (~{diff_bytes // 4} tokens)")
+
+        # Format for AI, summarizing in chunks first if the history is too large
+        spinner = Spinner(f"📚 Preparing commits for {args.provider}...")
+        spinner.start()
+        try:
+            with metrics.phase("formatting"):
+                commits_text, num_chunks = build_commits_text(
+                    prompt_commits,
+                    generator,
+                    budget=args.chunk_budget,
+                    max_concurrency=args.concurrency,
+                    context_clues=digest.context_clues()
+                )
+        finally:
+            spinner.stop()
+        metrics.count("prompt_chars", len(commits_text))
+        metrics.count("summary_chunks", num_chunks)
+        if num_chunks:
+            print(f"📚 Summarized {len(commits)} commits in {num_chunks} chunks to fit the ~{args.chunk_budget} token budget")
 
         # Generate tweets with loading indicator
-        generator = TweetGenerator(provider=args.provider)
+
+        if args.style == "all" or args.with_thread:
+            with metrics.phase("generation"):
+                generate_concurrently(args, generator, commits_text)
+            if not args.precompute:
+                save_watermarks(positions, args.author)
+            return
 
         if args.thread:
             spinner = Spinner(f"🤖 Generating tweet thread using {args.provider}...")
-            spinner.start()
-            try:
-                tweets = generator.generate_thread(commits_text)
-            finally:
-                spinner.stop()
-
-            print(f"✨ Generated tweet thread!\n")
-            print("📝 Tweet Thread:\n")
-            for i, tweet in enumerate(tweets, 1):
-                print(f"{i}. {tweet}")
-                if i < len(tweets):
-                    print()  # Empty line between tweets
+            header = "📝 Tweet Thread:\n"
         else:
             spinner = Spinner(f"🤖 Generating tweets using {args.provider}...")
-            spinner.start()
-            try:
-                tweets = generator.generate_tweets(
-                    commits_text,
-                    style=args.style,
-                    num_options=args.options
-                )
-            finally:
+            header = f"📝 Tweet Options ({args.style} style):\n"
+
+        shown = []
+
+        def show_tweet(tweet):
+            # Tweets stream in one at a time; the spinner stops at the first one
+            if not shown:
                 spinner.stop()
+                print(header)
+            elif args.thread:
+                print()  # Empty line between tweets
+            shown.append(tweet)
+            print(f"{len(shown)}. {tweet}" + ("" if args.thread else "\n"))
 
+        on_tweet = None if args.no_stream else show_tweet
+        spinner.start()
+        try:
+            with metrics.phase("generation"):
+                if args.thread:
+                    tweets = generator.generate_thread(commits_text, on_tweet=on_tweet)
+                else:
+                    tweets = generator.generate_tweets(
+                        commits_text,
+                        style=args.style,
+                        num_options=args.options,
+                        on_tweet=on_tweet
+                    )
+        finally:
+            spinner.stop()
+
+        if args.no_stream:
+            for tweet in tweets:
+                show_tweet(tweet)
+        if args.thread:
+            print(f"\n✨ Generated tweet thread!\n")
+        else:
             print(f"✨ Generated {len(tweets)} tweet options!\n")
-            print(f"📝 Tweet Options ({args.style} style):\n")
-            for i, tweet in enumerate(tweets, 1):
-                print(f"{i}. {tweet}\n")
 
+        print_token_usage(generator)
+        if generator.cache is not None and generator.cache.hits:
+            print("💾 Reused a cached response (pass --fresh to regenerate)")
         print("✨ Copy and paste your favorite!")
+        # Background pre-generation mustn't move --since last-run forward
+        if not args.precompute:
+            save_watermarks(positions, args.author)
 
     except ValueError as e:
         print(f"\n❌ Error: {e}", file=sys.stderr)
@@ -167,5 +607,309 @@ Examples:
         sys.exit(1)
 
 
+def backfill_main(argv):
+    """`scribe backfill`: one post per day or week of past history, written as JSONL"""
+    parser = argparse.ArgumentParser(
+        prog="scribe backfill",
+        description="Generate tweets for every day or week in a past time range, "
+                    "reading history once and generating buckets concurrently",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Each output line is a JSON object with the bucket's start and end dates,
+commit stats and tweets, written in bucket order as soon as it is ready.
+
+Examples:
+  scribe backfill --from 2024-05-01 --to 2024-05-14 > sprint.jsonl
+  scribe backfill --from "14 days ago" --bucket week --thread -o weeks.jsonl
+        """
+    )
+
+    parser.add_argument(
+        "--repo",
+        default=".",
+        help="Path to git repository (default: current directory)"
+    )
+
+    parser.add_argument(
+        "--from",
+        dest="start",
+        required=True,
+        help='Start of the range, e.g. "2024-05-01" or "14 days ago"'
+    )
+
+    parser.add_argument(
+        "--to",
+        dest="end",
+        default="today",
+        help="End of the range, inclusive (default: today)"
+    )
+
+    parser.add_argument(
+        "--bucket",
+        choices=BUCKETS,
+        default="day",
+        help="Group commits per day or per week (default: day)"
+    )
+
+    add_filter_arguments(parser)
+
+    parser.add_argument(
+        "--style",
+        choices=STYLES,
+        default="technical",
+        help="Tweet style (default: technical)"
+    )
+
+    parser.add_argument(
+        "--options",
+        type=int,
+        default=3,
+        help="Number of tweet options per bucket (default: 3)"
+    )
+
+    parser.add_argument(
+        "--thread",
+        action="store_true",
+        help="Generate a tweet thread per bucket instead of single tweets"
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum concurrent AI requests (default: 4)"
+    )
+
+    parser.add_argument(
+        "--chunk-budget",
+        type=int,
+        help="Approximate token budget per bucket; larger buckets are summarized in chunks first (default: 6000, or SCRIBE_CHUNK_TOKEN_BUDGET)"
+    )
+
+    add_collapse_arguments(parser)
+
+    add_diff_arguments(parser)
+
+    parser.add_argument(
+        "--provider",
+        choices=["deepseek", "openai"],
+        default="deepseek",
+        help="AI provider to use (default: deepseek)"
+    )
+
+    parser.add_argument(
+        "--git-backend",
+        choices=["log", "gitpython"],
+        default="log",
+        help="How commits are read (default: log)"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the commit metadata or response caches"
+    )
+
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Always call the AI provider instead of reusing a cached response"
+    )
+
+    parser.add_argument(
+        "-o", "--output",
+        default="-",
+        help="JSONL file to write (default: stdout)"
+    )
+
+    args = parser.parse_args(argv)
+    if args.chunk_budget is None:
+        args.chunk_budget = get_chunk_token_budget()
+
+    # Progress goes to stderr so stdout stays valid JSONL
+    log = sys.stderr
+    try:
+        print(f"🔍 Reading commits in {args.repo} from {args.start} to {args.end}...", file=log)
+        git_parser = GitParser(args.repo, backend=args.git_backend, cache=not args.no_cache)
+        commits = git_parser.iter_commits(since=args.start, author=args.author, until=args.end,
+                                          **filters_from_args(args))
+        buckets = bucket_commits(commits, args.bucket)
+        if not buckets:
+            print("\n❌ No commits found for the specified criteria.", file=log)
+            sys.exit(1)
+        total = sum(len(digest.records) for _, digest in buckets)
+        print(f"✅ Found {total} commit(s) in {len(buckets)} {args.bucket}(s)", file=log)
+
+        generator = TweetGenerator(provider=args.provider, cache=not args.no_cache, fresh=args.fresh)
+        digests = {start.isoformat(): (start, digest) for start, digest in buckets}
+        commits_texts = []
+        for label, (_, digest) in digests.items():
+            prompt_commits = collapse_for_prompt(args, digest.records)
+            if args.with_diffs:
+                add_diffs_for_prompt(args, prompt_commits, {None: git_parser.repo.working_dir})
+            # Busy buckets are summarized down to the budget like a normal run
+            commits_text, num_chunks = build_commits_text(
+                prompt_commits,
+                generator,
+                budget=args.chunk_budget,
+                max_concurrency=args.concurrency,
+                context_clues=digest.context_clues()
+            )
+            if num_chunks:
+                print(f"   📚 {label}: summarized {len(digest.records)} commits in {num_chunks} chunks", file=log)
+            commits_texts.append((label, commits_text))
+
+        out = sys.stdout if args.output == "-" else open(args.output, "w")
+        try:
+            def write_bucket(label, tweets):
+                start, digest = digests[label]
+                record = {
+                    "bucket": args.bucket,
+                    "start": label,
+                    "end": bucket_end(start, args.bucket).isoformat(),
+                    "commits": len(digest.records),
+                    "insertions": digest.insertions,
+                    "deletions": digest.deletions,
+                    "style": "thread" if args.thread else args.style,
+                    "tweets": tweets,
+                }
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                print(f"   📝 {label}: {len(tweets)} tweet(s) from {len(digest.records)} commit(s)", file=log)
+
+            print(f"🤖 Generating {len(commits_texts)} posts using {args.provider}...", file=log)
+            generator.generate_each(
+                commits_texts,
+                style=args.style,
+                num_options=args.options,
+                thread=args.thread,
+                max_concurrency=args.concurrency,
+                on_result=write_bucket
+            )
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        print("✨ Backfill complete!", file=log)
+
+    except ValueError as e:
+        print(f"\n❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ Unexpected error: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+def install_hook_main(argv):
+    """`scribe install-hook`: pre-generate tweets in the background after every commit"""
+    scribe_args = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, scribe_args = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(
+        prog="scribe install-hook",
+        description="Install a git post-commit hook that pre-generates tweets in the background, "
+                    "so a later `scribe` run with the same arguments answers from the cache",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  scribe install-hook                       # Pre-generate what a plain `scribe` would
+  scribe install-hook -- --style casual     # ...what `scribe --style casual` would
+  scribe install-hook --uninstall           # Remove the hook again
+        """
+    )
+
+    parser.add_argument(
+        "--repo",
+        default=".",
+        help="Path to git repository (default: current directory)"
+    )
+
+    parser.add_argument(
+        "--uninstall",
+        action="store_true",
+        help="Remove Scribe's part of the post-commit hook"
+    )
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.uninstall:
+            hook = uninstall_hook(args.repo)
+            if hook is None:
+                print("ℹ️  No Scribe post-commit hook installed")
+            else:
+                print(f"🗑️  Removed Scribe from {hook}")
+            return
+
+        # Check the arguments now rather than failing silently in the background
+        scribe_options = build_parser().parse_args(scribe_args)
+        if scribe_options.repo or scribe_options.workspace:
+            parser.error("the hook always runs in its own repository; drop --repo/--workspace")
+        if scribe_options.no_cache:
+            parser.error("--no-cache would throw the pre-generated results away")
+
+        hook = install_hook(args.repo, scribe_args)
+        print(f"✅ Installed post-commit hook at {hook}")
+        print(f"   After each commit: scribe {' '.join(scribe_args)}".rstrip() + " (in the background)")
+        print("   Log: .git/scribe/precompute.log")
+    except ValueError as e:
+        print(f"\n❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def serve_main(argv):
+    """`scribe serve`: keep repositories and AI clients warm for thin clients"""
+    parser = argparse.ArgumentParser(
+        prog="scribe serve",
+        description="Run a long-lived Scribe server. With SCRIBE_SERVER set to its address, "
+                    "`scribe` sends its arguments to the server instead of starting up from scratch",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  scribe serve                              # Listen on a Unix socket in the cache dir
+  scribe serve --port 7878                  # Listen on 127.0.0.1:7878 instead
+  SCRIBE_SERVER=127.0.0.1:7878 scribe --since yesterday
+        """
+    )
+
+    address_group = parser.add_mutually_exclusive_group()
+    address_group.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="Unix socket to listen on (default: server.sock in the cache dir, see SCRIBE_CACHE_DIR)"
+    )
+    address_group.add_argument(
+        "--port",
+        type=int,
+        help="Listen on 127.0.0.1:PORT instead of a Unix socket"
+    )
+
+    args = parser.parse_args(argv)
+
+    # Deferred: the server module imports this one
+    from .client import default_address
+    from .server import serve
+
+    try:
+        if args.port is not None:
+            address = f"127.0.0.1:{args.port}"
+        else:
+            address = args.socket or default_address()
+        serve(address)
+    except (ValueError, OSError) as e:
+        print(f"\n❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+COMMANDS = {
+    "backfill": backfill_main,
+    "install-hook": install_hook_main,
+    "serve": serve_main,
+}
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,105 @@
+"""
+Thin client for `scribe serve`
+
+When SCRIBE_SERVER is set, `scribe` sends its arguments to the daemon and
+prints what comes back instead of importing the pipeline, opening the
+repository and creating an AI client itself. Subcommands (backfill,
+install-hook, serve) and unreachable servers fall back to a local run.
+"""
+import json
+import os
+import socket
+import sys
+
+# Default port for `scribe serve --port` on systems without Unix sockets
+DEFAULT_PORT = 7878
+
+
+def parse_address(address):
+    """Return ("tcp", (host, port)) for "host:port" or a bare port, else ("unix", socket path)"""
+    host, _, port = address.rpartition(":")
+    if port.isdigit() and "/" not in address:
+        return "tcp", (host or "127.0.0.1", int(port))
+    return "unix", os.path.expanduser(address)
+
+
+def default_address():
+    """server.sock in the Scribe cache dir, or a localhost port where Unix sockets are unavailable"""
+    if hasattr(socket, "AF_UNIX"):
+        from .config import get_cache_dir
+        return str(get_cache_dir() / "server.sock")
+    return f"127.0.0.1:{DEFAULT_PORT}"
+
+
+def token_path():
+    """File holding the shared secret a TCP server expects, readable only by its owner"""
+    from .config import get_cache_dir
+    return get_cache_dir() / "server.token"
+
+
+def read_token(address):
+    """Token to show a TCP server, or None for a Unix socket, whose file permissions guard it instead"""
+    if parse_address(address)[0] != "tcp":
+        return None
+    return token_path().read_text().strip()
+
+
+def connect(address, timeout=2.0):
+    kind, target = parse_address(address)
+    sock = socket.socket(socket.AF_UNIX if kind == "unix" else socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(target)
+    except OSError:
+        sock.close()
+        raise
+    # Generation can take a while; only connecting is time-limited
+    sock.settimeout(None)
+    return sock
+
+
+def request(sock, address, argv, cwd=None, token=None):
+    """
+    Run `scribe <argv>` on the server, copying its output to ours as it arrives
+
+    Returns the command's exit code.
+    """
+    message = {"argv": list(argv), "cwd": cwd or os.getcwd()}
+    if token is not None:
+        message["token"] = token
+
+    with sock:
+        sock.sendall(json.dumps(message).encode() + b"\n")
+        for line in sock.makefile("rb"):
+            reply = json.loads(line)
+            if "exit" in reply:
+                return reply["exit"]
+            for name, text in reply.items():
+                stream = sys.stderr if name == "stderr" else sys.stdout
+                stream.write(text)
+                stream.flush()
+    print(f"\n❌ Error: Scribe server at {address} closed the connection", file=sys.stderr)
+    return 1
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    address = os.getenv("SCRIBE_SERVER")
+    # The main command takes no positional arguments, so anything else is a subcommand
+    subcommand = argv and not argv[0].startswith("-")
+    if address and not subcommand:
+        try:
+            # A TCP server's token file is gone if it was stopped or never started
+            token = read_token(address)
+            sock = connect(address)
+        except OSError as e:
+            print(f"⚠️  Scribe server at {address} is not reachable ({e}); running locally", file=sys.stderr)
+        else:
+            sys.exit(request(sock, address, argv, token=token))
+
+    from .cli import main as cli_main
+    return cli_main(argv)
+
+
+if __name__ == "__main__":
+    main()
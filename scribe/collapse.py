@@ -0,0 +1,183 @@
+import random
+import re
+import zlib
+from operator import eq
+
+from .records import CommitRecord
+
+# MinHash signature length (a power of two), split into bands for
+# locality-sensitive lookup
+NUM_HASHES = 64
+ROWS_PER_BAND = 4
+
+# Clusters compared per band bucket (the most recent), so pathological inputs stay linear
+MAX_CANDIDATES = 8
+
+# Distinct subjects listed in a folded entry
+MAX_FOLDED_SUBJECTS = 3
+
+_BIN_SHIFT = 32 - (NUM_HASHES - 1).bit_length()
+_VALUE_MASK = (1 << _BIN_SHIFT) - 1
+
+# Fixed pseudo-random order in which each empty bin looks for a filled one
+_DONORS = [random.Random(slot).sample(range(NUM_HASHES), NUM_HASHES) for slot in range(NUM_HASHES)]
+
+# Issue refs, SHAs, standalone numbers and punctuation carry no meaning for
+# "same kind of commit"; digits inside words (v2, py3, utf8) do
+_MESSAGE_NOISE = re.compile(r"#\d+|\b(?=[0-9a-f]*\d)[0-9a-f]{7,40}\b|\b\d+\b|[^\w\s]")
+
+
+def normalize_message(message):
+    """Lowercased first line without issue refs, SHAs, standalone numbers or punctuation"""
+    first_line = message.strip().split("\n", 1)[0].lower()
+    return " ".join(_MESSAGE_NOISE.sub(" ", first_line).split())
+
+
+def minhash(text):
+    """
+    MinHash signature over the character 3-grams of `text`
+
+    Uses one-permutation hashing: each shingle is hashed once and the hash's
+    top bits pick which of the NUM_HASHES minimums it competes for, instead
+    of hashing every shingle NUM_HASHES times. A commit subject has far
+    fewer shingles than bins, so each empty bin borrows the value of the
+    first filled bin in its own fixed random order of donors; unlike
+    borrowing from the next bin over, one differing shingle then only
+    shifts the bins that borrowed from it.
+    """
+    padded = f" {text} "
+    mins = [None] * NUM_HASHES
+    for i in range(len(padded) - 2):
+        h = zlib.crc32(padded[i:i + 3].encode())
+        slot = h >> _BIN_SHIFT
+        value = h & _VALUE_MASK
+        if mins[slot] is None or value < mins[slot]:
+            mins[slot] = value
+
+    signature = list(mins)
+    for slot in range(NUM_HASHES):
+        if signature[slot] is None:
+            for donor in _DONORS[slot]:
+                if mins[donor] is not None:
+                    # Tagged with the donor so it can't equal a bin's own minimum
+                    signature[slot] = (donor + 1) << _BIN_SHIFT | mins[donor]
+                    break
+    return tuple(signature)
+
+
+class _Cluster:
+    __slots__ = ("text", "signature", "files", "commits")
+
+    def __init__(self, text, signature, files, commit):
+        self.text = text
+        self.signature = signature
+        self.files = files
+        self.commits = [commit]
+
+    def shares_files(self, files):
+        """True if either side changed no files or they changed at least one file in common"""
+        return not files or not self.files or not files.isdisjoint(self.files)
+
+    def matches(self, text, signature, files, threshold):
+        """Similar messages touching some of the same files"""
+        # The file check is much cheaper than comparing signatures
+        if not self.shares_files(files):
+            return False
+        return sum(map(eq, signature, self.signature)) >= threshold * NUM_HASHES
+
+
+def collapse_commits(commits, threshold=0.7):
+    """
+    Fold near-duplicate commits ("wip", "fix typo", "address review") into one entry each
+
+    Commits in the same repository are grouped when they share a changed
+    file and their normalized messages are identical, or the MinHash
+    estimate of their messages' similarity reaches `threshold`. Candidates
+    are found through banded MinHash buckets, so grouping is linear in the
+    number of commits.
+
+    Args:
+        commits: Commit dicts or CommitRecords, newest first
+        threshold: Message similarity (0-1) needed to group commits whose
+            normalized messages differ
+
+    Returns:
+        List of commits where each group is replaced, at the position of its
+        newest commit, by one CommitRecord listing the group's distinct
+        subjects, with the union of changed files and summed stats; ungrouped
+        commits are returned unchanged
+    """
+    clusters = []
+    buckets = {}
+    by_text = {}
+    signatures = {}
+
+    for commit in commits:
+        text = normalize_message(commit["message"])
+        signature = signatures.get(text)
+        if signature is None:
+            signature = signatures[text] = minhash(text)
+        files = set(commit["files_changed"])
+        repo = commit.get("repo")
+
+        # Identical normalized messages group without touching the buckets
+        match = by_text.get((repo, text))
+        if match is not None and match.shares_files(files):
+            match.commits.append(commit)
+            match.files |= files
+            continue
+
+        keys = [
+            (repo, start, signature[start:start + ROWS_PER_BAND])
+            for start in range(0, NUM_HASHES, ROWS_PER_BAND)
+        ]
+
+        match = None
+        checked = set()
+        for key in keys:
+            for cluster in buckets.get(key, ())[-MAX_CANDIDATES:]:
+                if cluster in checked:
+                    continue
+                checked.add(cluster)
+                if cluster.matches(text, signature, files, threshold):
+                    match = cluster
+                    break
+            if match is not None:
+                break
+
+        if match is None:
+            match = _Cluster(text, signature, files, commit)
+            clusters.append(match)
+            for key in keys:
+                buckets.setdefault(key, []).append(match)
+        else:
+            match.commits.append(commit)
+            match.files |= files
+        # The latest cluster with this message is the likeliest to share files with the next
+        by_text[(repo, text)] = match
+
+    return [_fold(cluster.commits) for cluster in clusters]
+
+
+def _fold(commits):
+    """Merge a group of commits into one record, keeping the newest commit's identity"""
+    if len(commits) == 1:
+        return commits[0]
+
+    newest = commits[0]
+    subjects = list(dict.fromkeys(commit["message"].strip().split("\n", 1)[0] for commit in commits))
+    listed = "; ".join(subjects[:MAX_FOLDED_SUBJECTS])
+    if len(subjects) > MAX_FOLDED_SUBJECTS:
+        listed += f"; and {len(subjects) - MAX_FOLDED_SUBJECTS} more"
+    return CommitRecord(
+        sha=newest["sha"],
+        message=f"{listed} ({len(commits)} commits)",
+        author=newest["author"],
+        email=newest["email"],
+        date=newest["date"],
+        files_changed=dict.fromkeys(path for commit in commits for path in commit["files_changed"]),
+        insertions=sum(commit["stats"]["insertions"] for commit in commits),
+        deletions=sum(commit["stats"]["deletions"] for commit in commits),
+        files=sum(commit["stats"]["files"] for commit in commits),
+        repo=newest.get("repo"),
+    )
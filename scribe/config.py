@@ -1,18 +1,31 @@
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load .env from current directory or project root
-load_dotenv()
+_loaded = False
 
-# Also try to load from ~/.scriberc
-home_config = Path.home() / ".scriberc"
-if home_config.exists():
-    load_dotenv(home_config)
+
+def load_config():
+    """Load .env and ~/.scriberc into the environment (once, on first use)"""
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+
+    # Deferred so `scribe --help` doesn't pay for importing python-dotenv
+    from dotenv import load_dotenv
+
+    # Load .env from current directory or project root
+    load_dotenv()
+
+    # Also try to load from ~/.scriberc
+    home_config = Path.home() / ".scriberc"
+    if home_config.exists():
+        load_dotenv(home_config)
 
 
 def get_api_key(provider="deepseek"):
     """Get API key for the specified provider"""
+    load_config()
     if provider == "deepseek":
         key = os.getenv("DEEPSEEK_API_KEY")
         if not key:
@@ -32,7 +45,11 @@ def get_api_key(provider="deepseek"):
 
 
 def get_base_url(provider="deepseek"):
-    """Get base URL for the specified provider"""
+    """Get base URL for the specified provider (SCRIBE_BASE_URL overrides it)"""
+    load_config()
+    override = os.getenv("SCRIBE_BASE_URL")
+    if override:
+        return override
     if provider == "deepseek":
         return "https://api.deepseek.com"
     elif provider == "openai":
@@ -49,3 +66,102 @@ def get_model(provider="deepseek"):
         return "gpt-4o-mini"
     else:
         raise ValueError(f"Unknown provider: {provider}")
+
+
+def get_commit_cache_limits():
+    """Get (max entries, max age in days) for the per-repo commit cache"""
+    load_config()
+    max_entries = int(os.getenv("SCRIBE_COMMIT_CACHE_MAX_ENTRIES", "50000"))
+    max_age_days = float(os.getenv("SCRIBE_COMMIT_CACHE_MAX_AGE_DAYS", "90"))
+    return max_entries, max_age_days
+
+
+def get_cache_dir():
+    """Get the directory for Scribe's user-level caches"""
+    load_config()
+    cache_dir = os.getenv("SCRIBE_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir).expanduser()
+    xdg_cache = os.getenv("XDG_CACHE_HOME")
+    if xdg_cache:
+        return Path(xdg_cache) / "scribe"
+    return Path.home() / ".cache" / "scribe"
+
+
+def get_response_cache_limits():
+    """Get (TTL in seconds, max entries) for the LLM response cache"""
+    load_config()
+    ttl = float(os.getenv("SCRIBE_RESPONSE_CACHE_TTL", str(24 * 3600)))
+    max_entries = int(os.getenv("SCRIBE_RESPONSE_CACHE_MAX_ENTRIES", "500"))
+    return ttl, max_entries
+
+
+def get_collapse_threshold():
+    """Get the message similarity (0-1) at which near-duplicate commits are folded together"""
+    load_config()
+    return float(os.getenv("SCRIBE_COLLAPSE_THRESHOLD", "0.7"))
+
+
+def get_diff_budgets():
+    """Get (tokens per commit, tokens per run) for --with-diffs excerpts"""
+    load_config()
+    commit_tokens = int(os.getenv("SCRIBE_DIFF_COMMIT_TOKENS", "300"))
+    run_tokens = int(os.getenv("SCRIBE_DIFF_RUN_TOKENS", "2000"))
+    return commit_tokens, run_tokens
+
+
+def get_precompute_timings():
+    """
+    Get (debounce seconds, wait seconds) for post-commit pre-generation
+
+    The background job waits SCRIBE_PRECOMPUTE_DEBOUNCE seconds after the
+    latest commit before running, and a foreground run waits up to
+    SCRIBE_PRECOMPUTE_WAIT seconds for a job in progress instead of paying
+    for the same generation twice.
+    """
+    load_config()
+    debounce = float(os.getenv("SCRIBE_PRECOMPUTE_DEBOUNCE", "5"))
+    wait = float(os.getenv("SCRIBE_PRECOMPUTE_WAIT", "60"))
+    return debounce, wait
+
+
+def get_rate_limits(provider="deepseek"):
+    """
+    Get (requests/min, tokens/min, max retries) for the request scheduler
+
+    Limits come from e.g. DEEPSEEK_RPM / DEEPSEEK_TPM (OPENAI_RPM / OPENAI_TPM).
+    0 means no client-side limit until the provider's rate-limit headers
+    report one.
+    """
+    load_config()
+    prefix = provider.upper()
+    rpm = float(os.getenv(f"{prefix}_RPM", "0"))
+    tpm = float(os.getenv(f"{prefix}_TPM", "0"))
+    max_retries = int(os.getenv("SCRIBE_MAX_RETRIES", "5"))
+    return rpm, tpm, max_retries
+
+
+def get_chunk_token_budget():
+    """Get the token budget for one commits prompt before map-reduce summarization kicks in"""
+    load_config()
+    return int(os.getenv("SCRIBE_CHUNK_TOKEN_BUDGET", "6000"))
+
+
+def get_context_rules():
+    """
+    Get extra project-context rules from SCRIBE_CONTEXT_RULES
+
+    Format: "Clue: pattern, pattern; Other clue: pattern", e.g.
+    "Django: manage.py, settings.py; Terraform: .tf". Patterns are
+    case-insensitive substrings of changed file paths.
+    """
+    load_config()
+    rules = []
+    for entry in os.getenv("SCRIBE_CONTEXT_RULES", "").split(";"):
+        if ":" not in entry:
+            continue
+        clue, patterns = entry.split(":", 1)
+        patterns = [pattern.strip() for pattern in patterns.split(",") if pattern.strip()]
+        if clue.strip() and patterns:
+            rules.append((clue.strip(), patterns))
+    return rules
@@ -0,0 +1,104 @@
+from collections import namedtuple
+
+from .config import get_context_rules
+
+# A rule reports `clue` when any changed path contains one of `patterns`.
+# Case-sensitive rules are matched against the raw path, the rest against
+# the path lowercased once.
+Rule = namedtuple("Rule", ["clue", "patterns", "ignore_case"])
+
+# Only the first matching framework rule is reported
+FRAMEWORK_RULES = [
+    Rule("Next.js app", ("next.config", "app/page", "pages/"), False),
+    Rule("Vite app", ("vite.config",), False),
+    Rule("JavaScript/Node.js project", ("package.json",), False),
+]
+
+RULES = [
+    # Tech stack hints
+    Rule("React", (".tsx", ".jsx"), False),
+    Rule("Vue", (".vue",), False),
+    Rule("Svelte", (".svelte",), False),
+    Rule("Tailwind CSS", ("tailwind",), True),
+    # Deployment/infrastructure
+    Rule("Vercel deployment", ("vercel",), True),
+    Rule("Docker", ("docker",), True),
+    # App type hints
+    Rule("authentication features", ("auth", "login"), True),
+    Rule("API endpoints", ("api/", "routes/"), False),
+    Rule("database layer", ("db", "database", "prisma"), True),
+]
+
+
+def load_rules():
+    """Built-in rules followed by any user rules from SCRIBE_CONTEXT_RULES"""
+    user_rules = [Rule(clue, tuple(patterns), True) for clue, patterns in get_context_rules()]
+    return FRAMEWORK_RULES, RULES + user_rules
+
+
+class ProjectContext:
+    """
+    Incrementally infer what kind of project this is from changed paths
+
+    The rule table is compiled into two flat (pattern, clue) lists, one per
+    case mode. Each batch of paths, deduplicated, is joined into a single
+    newline-separated string (lowercased once) and every pending pattern is
+    searched for in it, so the scanning happens in C rather than in a Python
+    loop per path and rule. Newlines never occur in patterns, so a match
+    cannot span two paths. Matched rules drop out of later batches, so paths
+    are not remembered across batches and memory stays flat on long runs.
+    """
+
+    def __init__(self, framework_rules=None, rules=None):
+        if framework_rules is None or rules is None:
+            default_framework, default_rules = load_rules()
+            framework_rules = default_framework if framework_rules is None else framework_rules
+            rules = default_rules if rules is None else rules
+
+        self.framework_rules = list(framework_rules)
+        self.rules = list(rules)
+        self.matched = set()
+        self._compile()
+
+    def _compile(self):
+        """Flatten the rules not matched yet into exact-case and lowercase pattern lists"""
+        self.exact_patterns = []
+        self.folded_patterns = []
+        for rule in self.framework_rules + self.rules:
+            if rule.clue in self.matched:
+                continue
+            for pattern in rule.patterns:
+                if rule.ignore_case:
+                    self.folded_patterns.append((pattern.lower(), rule.clue))
+                else:
+                    self.exact_patterns.append((pattern, rule.clue))
+
+    def update(self, paths):
+        """Fold in another batch of changed paths"""
+        if not self.exact_patterns and not self.folded_patterns:
+            return
+
+        text = "\n".join(dict.fromkeys(paths))
+        if not text:
+            return
+
+        found = {clue for pattern, clue in self.exact_patterns if pattern in text}
+        if self.folded_patterns:
+            folded = text.lower()
+            found.update(clue for pattern, clue in self.folded_patterns if pattern in folded)
+
+        if found:
+            self.matched.update(found)
+            self._compile()
+
+    def clues(self):
+        """Return the inferred context clues in a stable order"""
+        context_clues = []
+        for rule in self.framework_rules:
+            if rule.clue in self.matched:
+                context_clues.append(rule.clue)
+                break
+        for rule in self.rules:
+            if rule.clue in self.matched and rule.clue not in context_clues:
+                context_clues.append(rule.clue)
+        return context_clues
@@ -0,0 +1,294 @@
+import difflib
+import subprocess
+from pathlib import PurePosixPath
+
+from .summarize import CHARS_PER_TOKEN
+
+# Blobs larger than this are skipped rather than diffed line by line
+MAX_BLOB_BYTES = 256 * 1024
+
+# Excerpt lines are cut to this many characters
+MAX_LINE_CHARS = 160
+
+# Each excerpt line is indented (6) and newline-terminated (1) in the prompt
+LINE_OVERHEAD = 7
+
+# Marks a hunk cut short to fit the budget
+TRUNCATED = "..."
+
+# Only this many of a commit's excerptable files are diffed, so a commit
+# touching thousands of files costs a bounded number of blob reads
+MAX_COMMIT_FILES = 64
+
+# A commit gets at least this much of the run budget, so a long history
+# gives its first commits useful excerpts instead of every commit a crumb
+MIN_COMMIT_BYTES = 200
+
+LOCK_FILES = {
+    "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml", "bun.lockb",
+    "cargo.lock", "poetry.lock", "pipfile.lock", "uv.lock", "composer.lock", "gemfile.lock",
+    "go.sum", "podfile.lock", "packages.lock.json", "flake.lock",
+}
+
+VENDORED_DIRS = {
+    "vendor", "vendors", "node_modules", "third_party", "third-party", "external",
+    "dist", "build", "out", "target", ".next", "__generated__", "generated",
+}
+
+GENERATED_SUFFIXES = (
+    ".min.js", ".min.css", ".map", ".lock", "_pb2.py", "_pb2_grpc.py", ".pb.go", ".pb.h", ".pb.cc",
+    ".g.dart", ".freezed.dart", ".designer.cs", ".generated.ts", ".generated.js", ".snap",
+    ".svg", ".png", ".jpg", ".jpeg", ".gif", ".ico", ".webp", ".pdf", ".woff", ".woff2", ".ttf",
+)
+
+
+# Tree entry modes of subdirectories and submodules
+TREE_MODE = b"40000"
+GITLINK_MODE = b"160000"
+
+
+def is_excerptable(path):
+    """False for lock files, vendored or build output directories and generated or binary assets"""
+    pure = PurePosixPath(path)
+    name = pure.name.lower()
+    if name in LOCK_FILES or name.endswith(GENERATED_SUFFIXES):
+        return False
+    return not any(part.lower() in VENDORED_DIRS for part in pure.parts[:-1])
+
+
+class BlobReader:
+    """
+    One long-lived `git cat-file --batch` process for reading objects
+
+    Every commit, tree and blob is requested over the same pipe, so reading
+    thousands of blobs costs one subprocess instead of one per file.
+    """
+
+    def __init__(self, repo_path):
+        self.proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def read(self, spec, max_bytes=None):
+        """
+        Return the contents of an object name such as "<sha>" or "<sha>:<path>"
+
+        Returns None if the object does not exist or is larger than `max_bytes`.
+        """
+        if "\n" in spec:
+            return None
+        self.proc.stdin.write(spec.encode() + b"\n")
+        self.proc.stdin.flush()
+
+        header = self.proc.stdout.readline().split()
+        if len(header) != 3:
+            # "<spec> missing" (or ambiguous): nothing follows
+            return None
+        size = int(header[2])
+        data = self.proc.stdout.read(size + 1)[:-1]
+        if max_bytes is not None and size > max_bytes:
+            return None
+        return data
+
+    def _commit_header(self, sha):
+        """Return (tree, first parent) of a commit; either is None if absent"""
+        tree = parent = None
+        for line in (self.read(sha) or b"").split(b"\n"):
+            if not line:
+                break
+            if line.startswith(b"tree "):
+                tree = line[5:].decode()
+            elif line.startswith(b"parent "):
+                parent = line[7:].decode()
+                break
+        return tree, parent
+
+    def commit_trees(self, sha):
+        """Return the tree of a commit and of its first parent (None for a root commit)"""
+        tree, parent = self._commit_header(sha)
+        return tree, self._commit_header(parent)[0] if parent else None
+
+    def read_tree(self, sha):
+        """Map each entry name of a tree to (mode, object id)"""
+        data = self.read(sha)
+        entries = {}
+        if not data:
+            return entries
+        # Object ids are stored raw: 20 bytes for SHA-1, 32 for SHA-256
+        id_bytes = len(sha) // 2
+        pos = 0
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            end = nul + 1 + id_bytes
+            name = data[space + 1:nul].decode("utf-8", errors="surrogateescape")
+            entries[name] = (data[pos:space], data[nul + 1:end].hex())
+            pos = end
+        return entries
+
+    def changed_files(self, sha):
+        """
+        List (path, old blob, new blob) for every file a commit changes
+
+        Merges are compared with their first parent, like the commit stats.
+        A blob is None on the side where the file doesn't exist. Subtrees
+        that are identical, or are vendored/build directories, are not read.
+        """
+        tree, parent_tree = self.commit_trees(sha)
+        changes = []
+        if tree is not None:
+            self._diff_trees("", parent_tree, tree, changes)
+        return changes
+
+    def _diff_trees(self, prefix, old, new, changes):
+        old_entries = self.read_tree(old) if old else {}
+        new_entries = self.read_tree(new) if new else {}
+        for name in sorted(old_entries.keys() | new_entries.keys()):
+            before, after = old_entries.get(name), new_entries.get(name)
+            if before == after:
+                continue
+            path = prefix + name
+            subtrees = [entry[1] if entry and entry[0] == TREE_MODE else None for entry in (before, after)]
+            if any(subtrees) and name.lower() not in VENDORED_DIRS:
+                self._diff_trees(path + "/", subtrees[0], subtrees[1], changes)
+            blobs = [entry[1] if entry and entry[0] not in (TREE_MODE, GITLINK_MODE) else None
+                     for entry in (before, after)]
+            if any(blobs):
+                changes.append((path, blobs[0], blobs[1]))
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.stdout.close()
+            self.proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _text(data):
+    if data is None:
+        return []
+    if b"\0" in data[:8000]:
+        raise ValueError("binary")
+    return data.decode("utf-8", errors="replace").splitlines()
+
+
+def _hunks(path, old_lines, new_lines):
+    """Split a one-line-context diff into (score, lines) hunks; score counts non-blank changed lines"""
+    hunks = []
+    current = None
+    for line in difflib.unified_diff(old_lines, new_lines, n=1, lineterm=""):
+        if line.startswith(("---", "+++")):
+            continue
+        if line.startswith("@@"):
+            current = [0, [f"{path} {line}"]]
+            hunks.append(current)
+            continue
+        if current is None:
+            continue
+        if line[:1] in "+-" and line[1:].strip():
+            current[0] += 1
+        current[1].append(line[:MAX_LINE_CHARS])
+    return [(score, lines) for score, lines in hunks if score]
+
+
+def commit_excerpt(reader, sha, max_bytes):
+    """
+    Pick the most significant hunks of a commit's changes within `max_bytes`
+
+    The changed files are listed from the commit's own trees rather than
+    the commit record, whose file list may have been trimmed. Hunks are
+    ranked by how many non-blank lines they change, taken while they fit,
+    then put back in file order.
+    """
+    changes = [change for change in reader.changed_files(sha) if is_excerptable(change[0])]
+    candidates = []
+    for order, (path, old_blob, new_blob) in enumerate(changes[:MAX_COMMIT_FILES]):
+        old = reader.read(old_blob, MAX_BLOB_BYTES) if old_blob else None
+        new = reader.read(new_blob, MAX_BLOB_BYTES) if new_blob else None
+        if old is None and new is None:
+            continue
+        try:
+            old_lines, new_lines = _text(old), _text(new)
+        except ValueError:
+            continue
+        for position, (score, lines) in enumerate(_hunks(path, old_lines, new_lines)):
+            candidates.append((score, order, position, lines))
+
+    chosen = []
+    used = 0
+    for score, order, position, lines in sorted(candidates, key=lambda hunk: -hunk[0]):
+        cost = sum(len(line.encode()) + LINE_OVERHEAD for line in lines)
+        if used + cost <= max_bytes:
+            chosen.append((order, position, lines))
+            used += cost
+            continue
+
+        # A hunk that doesn't fit whole is cut short, as long as its header
+        # and at least one changed line make it in
+        kept = []
+        cost = len(TRUNCATED) + LINE_OVERHEAD
+        for line in lines:
+            line_cost = len(line.encode()) + LINE_OVERHEAD
+            if used + cost + line_cost > max_bytes:
+                break
+            kept.append(line)
+            cost += line_cost
+        if len(kept) < 2:
+            continue
+        kept.append(TRUNCATED)
+        chosen.append((order, position, kept))
+        used += cost
+
+    chosen.sort()
+    return "\n".join(line for _, _, lines in chosen for line in lines), used
+
+
+def add_diff_excerpts(commits, repo_paths, commit_tokens=300, run_tokens=2000):
+    """
+    Attach a "diff" excerpt to each commit, within per-commit and per-run budgets
+
+    Args:
+        commits: CommitRecords (or commit dicts) in prompt order
+        repo_paths: Mapping of each commit's "repo" value (None for a
+            single repository) to the repository path
+        commit_tokens: Token budget for one commit's excerpt
+        run_tokens: Token budget for all excerpts together
+
+    Returns:
+        Number of bytes of excerpts added
+    """
+    run_bytes = run_tokens * CHARS_PER_TOKEN
+    share = max(MIN_COMMIT_BYTES, run_bytes // max(len(commits), 1))
+    commit_bytes = min(commit_tokens * CHARS_PER_TOKEN, share)
+
+    readers = {}
+    used = 0
+    try:
+        for commit in commits:
+            budget = min(commit_bytes, run_bytes - used)
+            if budget < MIN_COMMIT_BYTES:
+                break
+            repo = commit.get("repo")
+            if repo not in readers:
+                readers[repo] = BlobReader(repo_paths[repo])
+            excerpt, size = commit_excerpt(readers[repo], commit["sha"], budget)
+            if not excerpt:
+                continue
+            if isinstance(commit, dict):
+                commit["diff"] = excerpt
+            else:
+                commit.diff = excerpt
+            used += size
+    finally:
+        for reader in readers.values():
+            reader.close()
+    return used
@@ -1,149 +1,510 @@
-import git
+import subprocess
+import time
+from collections import Counter, namedtuple
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from .cache import CommitCache
+from .context import ProjectContext
+from .metrics import Metrics
+from .records import CommitRecord
+from .watermark import WatermarkStore
+
+# Record layout for the streaming backend: NUL-separated fields, starting with
+# \x1e and the SHA, then author, email, date and message, then the --numstat
+# entries. Git never puts a NUL inside a field, so records are parsed by field
+# position; a message may contain \x1e itself.
+LOG_RECORD_SEP = b"\x1e"
+LOG_FORMAT = "%x1e%H%x00%an%x00%ae%x00%cI%x00%B"
+LOG_CHUNK_SIZE = 64 * 1024
+
+# Commits looked up (and, on a miss, diffed) per round trip to the cache
+CACHE_BATCH_SIZE = 500
+
+BACKENDS = ("log", "gitpython")
+
+# Merges are diffed against their first parent. This also decides which merges
+# a path-limited walk selects, so every walk and listing passes it.
+MERGE_DIFF_OPTIONS = {"diff_merges": "first-parent"}
+
+# What `git log` walks: revisions (tips and ^exclusions), long options and pathspecs
+WalkSpec = namedtuple("WalkSpec", ["revisions", "options", "paths"])
+
+# --since value that walks everything after the saved per-repo watermark
+LAST_RUN = "last-run"
+
 
 class GitParser:
-    def __init__(self, repo_path="."):
-        """Initialize parser with a git repository path"""
+    def __init__(self, repo_path=".", backend="log", cache=False, metrics=None):
+        """
+        Initialize parser with a git repository path
+
+        Args:
+            repo_path: Path inside the repository
+            backend: "log" streams one `git log --numstat` process,
+                "gitpython" diffs every commit through GitPython
+            cache: Keep commit metadata in a per-repo SQLite cache so
+                repeat runs only diff commits they have not seen
+            metrics: Metrics that git read, parse and diff time is added to
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown git backend: {backend}")
+        self.backend = backend
+        self.metrics = metrics if metrics is not None else Metrics()
+
+        # GitPython is slow to import, so only load it once a repo is needed
+        import git
+
         try:
             self.repo = git.Repo(repo_path, search_parent_directories=True)
         except git.InvalidGitRepositoryError:
             raise ValueError(f"Not a git repository: {repo_path}")
 
-    def get_commits(self, since="today", author=None):
+        self.watermarks = WatermarkStore.for_git_dir(self.repo.git_dir)
+        self.position = None
+        self.watermark = None
+
+        self.cache = None
+        if cache:
+            self.cache = CommitCache(Path(self.repo.git_dir) / "scribe" / "commits.sqlite3")
+
+    def get_commits(self, since="today", author=None, **filters):
         """
         Get commits from the repository
 
         Args:
-            since: Time range (e.g., "today", "yesterday", "2 days ago", "2024-01-01")
+            since: Time range (e.g., "today", "yesterday", "2 days ago", "2024-01-01"),
+                or "last-run" for everything after the saved watermark
             author: Filter by author name (optional)
+            **filters: Extra filters evaluated by git itself:
+                until: Upper end of the time range, in the same formats as since
+                paths / exclude_paths: pathspecs a commit must (not) touch
+                no_merges: Skip merge commits
+                branches: Branches to walk instead of HEAD
+                all_branches: Walk every ref
 
         Returns:
             List of commit objects with metadata
         """
-        # Parse the since parameter
+        return list(self._iter_commit_dicts(since, author, **filters))
+
+    def iter_commits(self, since="today", author=None, **filters):
+        """
+        Lazily yield compact CommitRecord objects instead of building a list
+
+        Commits are read from git as they are consumed, so callers can fold
+        over the stream (see CommitDigest) without holding every commit's
+        full file list in memory. Takes the same filters as get_commits.
+        """
+        for commit_data in self._iter_commit_dicts(since, author, **filters):
+            yield CommitRecord.from_dict(commit_data)
+
+    def _iter_commit_dicts(self, since, author, **filters):
+        walk = self._walk_spec(since, author, **filters)
+
+        if self.cache is not None:
+            return self._iter_commits_cached(walk, author)
+        if self.backend == "gitpython":
+            return self._iter_commits_gitpython(walk, author)
+        return (
+            commit_data
+            for commit_data in self._run_log(self._git_args(walk))
+            if self._author_matches(commit_data["author"], author)
+        )
+
+    def _walk_spec(self, since, author, until=None, paths=None, exclude_paths=None, no_merges=False,
+                   branches=None, all_branches=False):
+        """
+        Work out what git should walk, with every filter pushed down into git
+
+        "last-run" excludes the tips saved by the previous run instead of
+        filtering by date; when there is no usable watermark yet it falls back
+        to today's commits. Either way the tips being walked are remembered so
+        they can be saved as the next watermark. git itself only emits each
+        commit once, even when several branches share history.
+        """
+        options = {}
+        if all_branches:
+            tips = self.repo.git.rev_parse("--all").split()
+            branch_key = "--all"
+            options["all"] = True
+        else:
+            refs = list(branches or ["HEAD"])
+            try:
+                tips = self.repo.git.rev_parse(*[f"{ref}^{{commit}}" for ref in refs]).split()
+            except Exception:
+                raise ValueError(f"Unknown branch: {', '.join(refs)}")
+            if branches:
+                branch_key = ",".join(refs)
+            else:
+                branch_key = self.repo.git.rev_parse("--abbrev-ref", "HEAD")
+        tips = list(dict.fromkeys(tips))
+
+        self.position = {
+            "branch": branch_key,
+            "sha": tips[0] if tips else None,
+            "tips": tips,
+            "date": self.repo.git.log("-1", "--format=%cI", *tips) if tips else None,
+        }
+        self.watermark = None
+
+        revisions = [] if all_branches else list(tips)
+        if since == LAST_RUN:
+            watermark = self.watermarks.get(branch_key, author)
+            old_tips = watermark.get("tips", [watermark["sha"]]) if watermark else []
+            if old_tips and all(self._commit_exists(sha) for sha in old_tips):
+                self.watermark = watermark
+                revisions += [f"^{sha}" for sha in old_tips]
+            else:
+                since = "today"
+        if since != LAST_RUN:
+            options["since"] = self._parse_since(since).isoformat()
+        if until:
+            options["until"] = self._parse_until(until).isoformat()
+
+        if author:
+            # Case-insensitive substring match, like the Python-side check
+            options["author"] = author
+            options["fixed_strings"] = True
+            options["regexp_ignore_case"] = True
+        if no_merges:
+            options["no_merges"] = True
+
+        pathspecs = list(paths or []) + [f":(exclude){path}" for path in exclude_paths or []]
+        if pathspecs:
+            if not paths:
+                # An exclude-only pathspec still needs something to exclude from
+                pathspecs.insert(0, ".")
+
+        return WalkSpec(revisions, options, pathspecs)
+
+    def _commit_exists(self, sha):
+        try:
+            self.repo.git.cat_file("-e", f"{sha}^{{commit}}")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _git_args(walk):
+        """
+        Turn a WalkSpec into `git log` arguments
+
+        Used for both the cached SHA listing and the streaming walk, so they
+        select the same commits.
+        """
+        options = dict(MERGE_DIFF_OPTIONS, **walk.options)
+        if walk.paths:
+            # Report each matching commit's full stats, not just the matched paths
+            options["full_diff"] = True
+        args = []
+        for name, value in options.items():
+            flag = "--" + name.replace("_", "-")
+            if value is True:
+                args.append(flag)
+            else:
+                args.append(f"{flag}={value}")
+        args.extend(walk.revisions)
+        if walk.paths:
+            args.append("--")
+            args.extend(walk.paths)
+        return args
+
+    def _parse_since(self, since):
+        """Turn a --since value into a datetime"""
         if since == "today":
-            since_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         elif since == "yesterday":
-            since_date = (datetime.now() - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+            return (datetime.now() - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
         elif "days ago" in since:
             days = int(since.split()[0])
-            since_date = datetime.now() - timedelta(days=days)
+            return datetime.now() - timedelta(days=days)
         elif "hours ago" in since:
             hours = int(since.split()[0])
-            since_date = datetime.now() - timedelta(hours=hours)
+            return datetime.now() - timedelta(hours=hours)
         else:
             # Try to parse as date
             try:
-                since_date = datetime.fromisoformat(since)
+                return datetime.fromisoformat(since)
             except ValueError:
                 raise ValueError(f"Invalid since format: {since}")
 
-        # Get commits
-        commits = []
-        for commit in self.repo.iter_commits(since=since_date.isoformat()):
+    def _parse_until(self, until):
+        """Turn an --until value into a datetime; a bare date includes that whole day"""
+        if until == "today":
+            return datetime.now()
+        moment = self._parse_since(until)
+        if until == "yesterday" or ("ago" not in until and ":" not in until):
+            moment = moment.replace(hour=23, minute=59, second=59, microsecond=0)
+        return moment
+
+    @staticmethod
+    def _author_matches(name, author):
+        return not author or author.lower() in name.lower()
+
+    def _iter_commits_cached(self, walk, author=None):
+        """List commits in range cheaply, then only diff the ones not cached yet"""
+        # --diff-merges would print merges' patches; only the selection is wanted here
+        output = self.repo.git.log("--format=%H%x1f%an", "--no-patch", *self._git_args(walk))
+        shas = []
+        for line in output.splitlines():
+            sha, name = line.split("\x1f", 1)
+            if self._author_matches(name, author):
+                shas.append(sha)
+
+        # Work in batches so only one batch of records is held at a time
+        for i in range(0, len(shas), CACHE_BATCH_SIZE):
+            batch = shas[i:i + CACHE_BATCH_SIZE]
+            with self.metrics.phase("cache_lookup"):
+                cached = self.cache.get_many(batch)
+            missing = [sha for sha in batch if sha not in cached]
+            if missing:
+                if self.backend == "gitpython":
+                    with self.metrics.phase("diff_stats"):
+                        fresh = [self._commit_data_from_gitpython(self.repo.commit(sha)) for sha in missing]
+                else:
+                    fresh = list(self._run_log(self._git_args(WalkSpec([], {}, [])), stdin_shas=missing))
+                self.cache.put_many(fresh)
+                cached.update((commit_data["sha"], commit_data) for commit_data in fresh)
+
+            for sha in batch:
+                yield cached[sha]
+
+    def _iter_commits_gitpython(self, walk, author=None):
+        """
+        Walk commits through GitPython, diffing each one against its parent
+
+        `git rev-list` rejects --full-diff; this backend computes whole-commit
+        stats itself, so only the merge option is added.
+        """
+        options = dict(MERGE_DIFF_OPTIONS, **walk.options)
+        for commit in self.repo.iter_commits(walk.revisions, paths=walk.paths, **options):
             # Filter by author if specified
-            if author and author.lower() not in commit.author.name.lower():
+            if not self._author_matches(commit.author.name, author):
                 continue
+            with self.metrics.phase("diff_stats"):
+                commit_data = self._commit_data_from_gitpython(commit)
+            yield commit_data
 
-            commit_data = {
-                "hash": commit.hexsha[:7],
-                "message": commit.message.strip(),
-                "author": commit.author.name,
-                "email": commit.author.email,
-                "date": commit.committed_datetime,
-                "files_changed": [],
-                "stats": {
-                    "insertions": 0,
-                    "deletions": 0,
-                    "files": 0
-                }
+    @staticmethod
+    def _commit_data_from_gitpython(commit):
+        commit_data = {
+            "sha": commit.hexsha,
+            "hash": commit.hexsha[:7],
+            "message": commit.message.strip(),
+            "author": commit.author.name,
+            "email": commit.author.email,
+            "date": commit.committed_datetime,
+            "files_changed": [],
+            "stats": {
+                "insertions": 0,
+                "deletions": 0,
+                "files": 0
             }
+        }
+
+        # Get file changes
+        if commit.parents:
+            diffs = commit.parents[0].diff(commit)
+            for diff in diffs:
+                if diff.a_path:
+                    commit_data["files_changed"].append(diff.a_path)
+                elif diff.b_path:
+                    commit_data["files_changed"].append(diff.b_path)
+
+            # Get stats
+            stats = commit.stats.total
+            commit_data["stats"]["insertions"] = stats.get("insertions", 0)
+            commit_data["stats"]["deletions"] = stats.get("deletions", 0)
+            commit_data["stats"]["files"] = stats.get("files", 0)
+
+        return commit_data
+
+    def _run_log(self, revision_args, stdin_shas=None):
+        """
+        Stream commits from a single `git log --numstat -z` process
+
+        Root commits get no stats, matching the GitPython backend; merges are
+        diffed as `revision_args` say (see _git_args). When `stdin_shas` is
+        given, exactly those commits are read instead of walking history.
+        """
+        cmd = [
+            "git", "-c", "log.showRoot=false", "log",
+            "-z", "--numstat", "--no-renames",
+            f"--format={LOG_FORMAT}",
+        ] + list(revision_args)
+        if stdin_shas is not None:
+            cmd += ["--no-walk=unsorted", "--stdin"]
+
+        proc = subprocess.Popen(
+            cmd,
+            cwd=self.repo.working_dir,
+            stdin=subprocess.PIPE if stdin_shas is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        try:
+            if stdin_shas is not None:
+                # git reads all of stdin before it starts writing the log
+                proc.stdin.write("".join(f"{sha}\n" for sha in stdin_shas).encode())
+                proc.stdin.close()
+
+            # git computes the numstat diffs while we read, so "git_read" is
+            # where diff/stats time shows up for this backend
+            read, clock, metrics = proc.stdout.read, time.perf_counter, self.metrics
+            buffer = b""
+            fields = None
+            while True:
+                start = clock()
+                chunk = read(LOG_CHUNK_SIZE)
+                metrics.add_time("git_read", clock() - start)
+                if not chunk:
+                    break
+                tokens = (buffer + chunk).split(b"\0")
+                buffer = tokens.pop()
+                start = clock()
+                parsed = []
+                for token in tokens:
+                    fields = self._add_log_field(fields, token, parsed)
+                metrics.add_time("parse_records", clock() - start)
+                yield from parsed
+
+            parsed = []
+            fields = self._add_log_field(fields, buffer, parsed)
+            if fields is not None:
+                parsed.append(self._parse_log_record(fields))
+            yield from parsed
+        finally:
+            proc.stdout.close()
+            stderr = proc.stderr.read()
+            proc.stderr.close()
+            returncode = proc.wait()
 
-            # Get file changes
-            if commit.parents:
-                diffs = commit.parents[0].diff(commit)
-                for diff in diffs:
-                    if diff.a_path:
-                        commit_data["files_changed"].append(diff.a_path)
-                    elif diff.b_path:
-                        commit_data["files_changed"].append(diff.b_path)
+        if returncode != 0:
+            raise ValueError(f"git log failed: {stderr.decode('utf-8', 'replace').strip()}")
+
+    @classmethod
+    def _add_log_field(cls, fields, token, parsed):
+        """
+        Add one NUL-separated field to the record being read, finishing it into `parsed`
 
-                # Get stats
-                stats = commit.stats.total
-                commit_data["stats"]["insertions"] = stats.get("insertions", 0)
-                commit_data["stats"]["deletions"] = stats.get("deletions", 0)
-                commit_data["stats"]["files"] = stats.get("files", 0)
+        The five header fields are taken by position, so only a field after
+        them can start the next record. Returns the record's fields so far.
+        """
+        if fields is not None and len(fields) < 5:
+            fields.append(token)
+            return fields
+        token = token.lstrip(b"\n")
+        if token.startswith(LOG_RECORD_SEP):
+            if fields is not None:
+                parsed.append(cls._parse_log_record(fields))
+            return [token[1:]]
+        if fields is None:
+            if token:
+                raise ValueError(f"Unexpected git log output: {token[:80]!r}")
+            return None
+        if token:
+            fields.append(token)
+        return fields
+
+    @staticmethod
+    def _parse_log_record(fields):
+        """Parse one LOG_FORMAT record (header fields plus numstat entries, as bytes)"""
+        fields = [field.decode("utf-8", "replace") for field in fields]
+        if len(fields) < 5:
+            raise ValueError(f"Truncated git log record for commit {fields[0][:12]}")
+        hexsha, name, email, date, message = fields[:5]
+
+        commit_data = {
+            "sha": hexsha,
+            "hash": hexsha[:7],
+            "message": message.strip(),
+            "author": name,
+            "email": email,
+            "date": datetime.fromisoformat(date),
+            "files_changed": [],
+            "stats": {
+                "insertions": 0,
+                "deletions": 0,
+                "files": 0
+            }
+        }
 
-            commits.append(commit_data)
+        for entry in fields[5:]:
+            parts = entry.split("\t", 2)
+            if len(parts) != 3:
+                raise ValueError(f"Unexpected numstat entry for commit {hexsha[:12]}: {entry[:80]!r}")
+            insertions, deletions, path = parts
+            commit_data["files_changed"].append(path)
+            # Binary files report "-" for both counts
+            if insertions != "-":
+                commit_data["stats"]["insertions"] += int(insertions)
+                commit_data["stats"]["deletions"] += int(deletions)
+            commit_data["stats"]["files"] += 1
 
-        return commits
+        return commit_data
 
-    def _infer_project_context(self, commits):
+    @staticmethod
+    def _infer_project_context(commits):
         """Infer what kind of project this is from files and commits"""
-        all_files = []
+        context = ProjectContext()
         for commit in commits:
-            all_files.extend(commit['files_changed'])
-
-        # Look for indicators
-        context_clues = []
-
-        # Framework detection
-        if any('next.config' in f or 'app/page' in f or 'pages/' in f for f in all_files):
-            context_clues.append("Next.js app")
-        elif any('vite.config' in f for f in all_files):
-            context_clues.append("Vite app")
-        elif any('package.json' in f for f in all_files):
-            context_clues.append("JavaScript/Node.js project")
-
-        # Tech stack hints
-        if any('.tsx' in f or '.jsx' in f for f in all_files):
-            context_clues.append("React")
-        if any('.vue' in f for f in all_files):
-            context_clues.append("Vue")
-        if any('.svelte' in f for f in all_files):
-            context_clues.append("Svelte")
-        if any('tailwind' in f.lower() for f in all_files):
-            context_clues.append("Tailwind CSS")
-
-        # Deployment/infrastructure
-        if any('vercel' in f.lower() for f in all_files):
-            context_clues.append("Vercel deployment")
-        if any('docker' in f.lower() for f in all_files):
-            context_clues.append("Docker")
-
-        # App type hints
-        if any('auth' in f.lower() or 'login' in f.lower() for f in all_files):
-            context_clues.append("authentication features")
-        if any('api/' in f or 'routes/' in f for f in all_files):
-            context_clues.append("API endpoints")
-        if any('db' in f.lower() or 'database' in f.lower() or 'prisma' in f.lower() for f in all_files):
-            context_clues.append("database layer")
-
-        return context_clues
-
-    def format_commits_for_ai(self, commits):
-        """Format commits into a readable text for AI processing"""
+            context.update(commit['files_changed'])
+        return context.clues()
+
+    @staticmethod
+    def format_commits_for_ai(commits, context_clues=None):
+        """
+        Format commits into a readable text for AI processing
+
+        Commits tagged with a "repo" key (see scribe.batch) are grouped into
+        one section per repository when they span more than one. Pass
+        `context_clues` (e.g. from CommitDigest) to skip re-scanning files.
+        """
         if not commits:
             return "No commits found for the specified time range."
 
         text_parts = []
 
         # Add project context
-        context_clues = self._infer_project_context(commits)
+        if context_clues is None:
+            context_clues = GitParser._infer_project_context(commits)
         if context_clues:
             text_parts.append(f"PROJECT CONTEXT (inferred from files): {', '.join(context_clues)}\n")
 
-        text_parts.append(f"COMMITS ({len(commits)} total):\n")
+        repo_counts = Counter(commit.get("repo") for commit in commits)
+        grouped = len(repo_counts) > 1
+        if grouped:
+            text_parts.append(f"COMMITS ({len(commits)} total across {len(repo_counts)} repositories):\n")
+        else:
+            text_parts.append(f"COMMITS ({len(commits)} total):\n")
 
+        current_repo = None
         for i, commit in enumerate(commits, 1):
-            text_parts.append(f"\n{i}. Commit: {commit['message']}")
-            text_parts.append(f"   Files changed: {commit['stats']['files']} (+{commit['stats']['insertions']} -{commit['stats']['deletions']})")
+            if grouped and commit.get("repo") != current_repo:
+                current_repo = commit.get("repo")
+                text_parts.append(f"\nREPOSITORY: {current_repo} ({repo_counts[current_repo]} commits)")
 
-            if commit['files_changed']:
-                # Group files by type for better context
-                key_files = commit['files_changed'][:8]  # Show more files
-                text_parts.append(f"   Modified: {', '.join(key_files)}")
+            text_parts.extend(GitParser.format_commit(i, commit))
 
         return "\n".join(text_parts)
+
+    @staticmethod
+    def format_commit(i, commit):
+        """Format a single numbered commit as prompt lines"""
+        lines = [
+            f"\n{i}. Commit: {commit['message']}",
+            f"   Files changed: {commit['stats']['files']} (+{commit['stats']['insertions']} -{commit['stats']['deletions']})",
+        ]
+
+        if commit['files_changed']:
+            # Group files by type for better context
+            key_files = commit['files_changed'][:8]  # Show more files
+            lines.append(f"   Modified: {', '.join(key_files)}")
+
+        if commit.get('diff'):
+            # Opt-in excerpt of the most significant hunks (--with-diffs)
+            lines.append("   Diff excerpt:")
+            lines.extend(f"      {line}" for line in commit['diff'].split("\n"))
+
+        return lines
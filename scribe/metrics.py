@@ -0,0 +1,100 @@
+import json
+import time
+from contextlib import contextmanager
+
+
+class Metrics:
+    """
+    Wall-time per phase, counters and token usage for one Scribe run
+
+    Phases accumulate, so a phase entered many times (e.g. once per commit)
+    reports its total. Timings use time.perf_counter.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self.usage = {
+            "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "requests": 0,
+        }
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def set_time(self, name, seconds):
+        """Record a one-off measurement such as time to first token (first value wins)"""
+        self.phases.setdefault(name, seconds)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, data):
+        """Add phases and counters from another run's `to_dict()`, e.g. a worker process"""
+        for name, seconds in data.get("phases", {}).items():
+            self.add_time(name, seconds)
+        for name, value in data.get("counters", {}).items():
+            self.count(name, value)
+
+    def record_usage(self, usage):
+        """
+        Add an OpenAI-style `response.usage` object (or dict) to the totals
+
+        Prompt tokens served from the provider's prompt cache are reported as
+        prompt_tokens_details.cached_tokens by OpenAI and as
+        prompt_cache_hit_tokens by DeepSeek; both count as cached_tokens.
+        """
+        if usage is None:
+            return
+        for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            self.usage[field] += _field(usage, field) or 0
+        cached = _field(_field(usage, "prompt_tokens_details"), "cached_tokens")
+        if cached is None:
+            cached = _field(usage, "prompt_cache_hit_tokens")
+        self.usage["cached_tokens"] += cached or 0
+        self.usage["requests"] += 1
+
+    def to_dict(self):
+        return {
+            "total_seconds": time.perf_counter() - self.started,
+            "phases": dict(self.phases),
+            "counters": dict(self.counters),
+            "usage": dict(self.usage),
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+    def report(self):
+        """Human-readable summary for --profile"""
+        data = self.to_dict()
+        lines = [f"⏱️  Profile (total {data['total_seconds'] * 1000:.1f} ms)"]
+        for name, seconds in data["phases"].items():
+            lines.append(f"   {name:<24} {seconds * 1000:10.1f} ms")
+        for name, value in data["counters"].items():
+            lines.append(f"   {name:<24} {value:>10}")
+        usage = data["usage"]
+        if usage["requests"]:
+            lines.append(
+                f"   tokens: {usage['prompt_tokens']} prompt ({usage['cached_tokens']} cached) "
+                f"+ {usage['completion_tokens']} completion over {usage['requests']} request(s)"
+            )
+        return "\n".join(lines)
+
+
+def _field(obj, name):
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
@@ -0,0 +1,254 @@
+"""
+Background pre-generation, started from a git post-commit hook
+
+The hook runs `python -m scribe.precompute -- <scribe args>` in the
+background. That marks the repository as pending and, unless a worker is
+already running, starts one detached, low-priority worker. The worker waits
+until no commit has arrived for the debounce period, then runs the normal
+`scribe` pipeline once for however many commits piled up, filling the commit
+metadata and response caches so a later `scribe` run with the same arguments
+is served from them.
+"""
+import argparse
+import os
+import re
+import shlex
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .config import get_precompute_timings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+HOOK_BEGIN = "# >>> scribe precompute >>>"
+HOOK_END = "# <<< scribe precompute <<<"
+
+_HOOK_BLOCK = re.compile(re.escape(HOOK_BEGIN) + r".*?" + re.escape(HOOK_END) + r"\n?", re.DOTALL)
+
+
+def _git_path(repo_path, *args):
+    """Absolute path printed by `git rev-parse <args>` in `repo_path`"""
+    result = subprocess.run(
+        ["git", "rev-parse", *args],
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    if result.returncode != 0:
+        raise ValueError(f"Not a git repository: {repo_path}")
+    # Relative output is relative to the directory git ran in
+    return Path(repo_path, result.stdout.strip()).resolve()
+
+
+def state_dir(git_dir):
+    return Path(git_dir) / "scribe"
+
+
+def _try_lock(lock_file):
+    """Take an exclusive lock on an open file without blocking; released when the file is closed"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def is_running(git_dir):
+    """True while a precompute worker holds this repository's lock"""
+    lock_path = state_dir(git_dir) / "precompute.lock"
+    if not lock_path.exists():
+        return False
+    with open(lock_path, "a+b") as lock_file:
+        return not _try_lock(lock_file)
+
+
+def wait_for_precompute(git_dir, timeout=None):
+    """
+    Wait for a running precompute worker to finish
+
+    Returns True if the worker finished (or none was running), False if
+    `timeout` seconds passed first.
+    """
+    if timeout is None:
+        _, timeout = get_precompute_timings()
+    deadline = time.monotonic() + timeout
+    while is_running(git_dir):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.2)
+    return True
+
+
+def hook_command(scribe_args=()):
+    """Shell line that queues a background pre-generation without slowing down the commit"""
+    command = [sys.executable, "-m", "scribe.precompute", "--", *scribe_args]
+    return " ".join(shlex.quote(part) for part in command) + " </dev/null >/dev/null 2>&1 &"
+
+
+def install_hook(repo_path, scribe_args=()):
+    """
+    Add (or replace) Scribe's block in the repository's post-commit hook
+
+    An existing hook is kept; the block goes right after its shebang so an
+    early `exit` in the hook can't skip it. Returns the hook path.
+    """
+    hook = _git_path(repo_path, "--git-path", "hooks/post-commit")
+    block = (
+        f"{HOOK_BEGIN}\n"
+        "# Pre-generates tweets in the background; remove with `scribe install-hook --uninstall`\n"
+        f"{hook_command(scribe_args)}\n"
+        f"{HOOK_END}\n"
+    )
+
+    text = _HOOK_BLOCK.sub("", hook.read_text()) if hook.exists() else "#!/bin/sh\n"
+    if text.startswith("#!"):
+        shebang, _, body = text.partition("\n")
+        if not shebang.rstrip().endswith("sh"):
+            raise ValueError(
+                f"{hook} is not a shell script; add this line to it instead:\n  {hook_command(scribe_args)}"
+            )
+        text = f"{shebang}\n{block}{body}"
+    else:
+        text = f"#!/bin/sh\n{block}{text}"
+
+    hook.parent.mkdir(parents=True, exist_ok=True)
+    hook.write_text(text)
+    hook.chmod(hook.stat().st_mode | 0o111)
+    return hook
+
+
+def uninstall_hook(repo_path):
+    """Remove Scribe's block from the post-commit hook, deleting the hook if nothing else is left"""
+    hook = _git_path(repo_path, "--git-path", "hooks/post-commit")
+    if not hook.exists():
+        return None
+    text = hook.read_text()
+    remaining = _HOOK_BLOCK.sub("", text)
+    if remaining == text:
+        return None
+    if not [line for line in remaining.splitlines()[1:] if line.strip()]:
+        hook.unlink()
+    else:
+        hook.write_text(remaining)
+    return hook
+
+
+def queue(repo_path, scribe_args=()):
+    """Mark the repository as changed and start a worker unless one is already running"""
+    git_dir = _git_path(repo_path, "--git-dir")
+    state = state_dir(git_dir)
+    state.mkdir(parents=True, exist_ok=True)
+    # The pending file's mtime is the time of the latest commit
+    (state / "precompute.pending").write_text(str(time.time()))
+
+    if is_running(git_dir):
+        # The running worker sees the newer pending mark and runs again
+        return False
+
+    command = [sys.executable, "-m", "scribe.precompute", "--worker", "--repo", str(repo_path), "--", *scribe_args]
+    options = {}
+    if os.name == "nt":
+        options["creationflags"] = (
+            subprocess.DETACHED_PROCESS
+            | subprocess.CREATE_NEW_PROCESS_GROUP
+            | subprocess.BELOW_NORMAL_PRIORITY_CLASS
+        )
+    else:
+        options["start_new_session"] = True
+    subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+        **options
+    )
+    return True
+
+
+def run_worker(repo_path, scribe_args=(), debounce=None):
+    """
+    Debounce and run pre-generation until nothing is pending
+
+    Only one worker per repository holds the lock; commits arriving while it
+    sleeps or generates just move the pending mark, so any number of them
+    cost one more run at most.
+    """
+    if debounce is None:
+        debounce, _ = get_precompute_timings()
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+    state = state_dir(_git_path(repo_path, "--git-dir"))
+    pending = state / "precompute.pending"
+    while True:
+        with open(state / "precompute.lock", "a+b") as lock_file:
+            if not _try_lock(lock_file):
+                return
+            while True:
+                try:
+                    marked = pending.stat().st_mtime
+                except FileNotFoundError:
+                    break
+                delay = marked + debounce - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                    continue
+                pending.unlink()
+                _generate(repo_path, scribe_args, state / "precompute.log")
+        # A commit may have been queued while the lock was being released
+        if not pending.exists():
+            return
+
+
+def _generate(repo_path, scribe_args, log_path):
+    command = [
+        sys.executable, "-m", "scribe.cli",
+        "--repo", str(repo_path), "--no-stream", "--precompute", *scribe_args,
+    ]
+    with open(log_path, "w") as log:
+        log.write(f"$ {' '.join(shlex.quote(part) for part in command)}\n")
+        log.flush()
+        subprocess.run(command, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    scribe_args = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, scribe_args = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(
+        prog="python -m scribe.precompute",
+        description="Queue a background pre-generation (run by the post-commit hook); "
+                    "arguments after -- are passed to scribe"
+    )
+    parser.add_argument(
+        "--repo",
+        default=".",
+        help="Path to git repository (default: current directory)"
+    )
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    repo_path = os.path.abspath(args.repo)
+    if args.worker:
+        run_worker(repo_path, scribe_args)
+    else:
+        queue(repo_path, scribe_args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+from .context import ProjectContext
+
+
+class CommitRecord:
+    """
+    Compact commit record for streaming consumers
+
+    Supports dict-style access (record["message"], record["stats"]["files"],
+    record.get("repo")) so it can be passed anywhere a commit_data dict is.
+    """
+
+    __slots__ = (
+        "sha", "hash", "message", "author", "email", "date",
+        "files_changed", "insertions", "deletions", "files", "repo", "diff",
+    )
+
+    def __init__(self, sha, message, author, email, date, files_changed=(),
+                 insertions=0, deletions=0, files=0, repo=None, diff=None):
+        self.sha = sha
+        self.hash = sha[:7]
+        self.message = message
+        self.author = author
+        self.email = email
+        self.date = date
+        self.files_changed = tuple(files_changed)
+        self.insertions = insertions
+        self.deletions = deletions
+        self.files = files
+        self.repo = repo
+        # Optional excerpt of the most significant hunks (see scribe.diffs)
+        self.diff = diff
+
+    @classmethod
+    def from_dict(cls, commit_data):
+        return cls(
+            sha=commit_data["sha"],
+            message=commit_data["message"],
+            author=commit_data["author"],
+            email=commit_data["email"],
+            date=commit_data["date"],
+            files_changed=commit_data["files_changed"],
+            insertions=commit_data["stats"]["insertions"],
+            deletions=commit_data["stats"]["deletions"],
+            files=commit_data["stats"]["files"],
+            repo=commit_data.get("repo"),
+            diff=commit_data.get("diff"),
+        )
+
+    @property
+    def stats(self):
+        return {"insertions": self.insertions, "deletions": self.deletions, "files": self.files}
+
+    def __getitem__(self, key):
+        if key not in self.__slots__ and key != "stats":
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"CommitRecord({self.hash} {self.message.splitlines()[0] if self.message else ''!r})"
+
+
+class CommitDigest:
+    """
+    One-pass fold over a commit stream
+
+    Project context is inferred from each commit's full file list as it
+    passes, then only the first `keep_files` paths are retained, so memory
+    does not grow with the size of vendored or generated-file commits.
+    """
+
+    def __init__(self, keep_files=8):
+        self.keep_files = keep_files
+        self.context = ProjectContext()
+        self.records = []
+        self.insertions = 0
+        self.deletions = 0
+        self.files = 0
+
+    def add(self, record):
+        self.context.update(record.files_changed)
+        record.files_changed = record.files_changed[:self.keep_files]
+        self.insertions += record.insertions
+        self.deletions += record.deletions
+        self.files += record.files
+        self.records.append(record)
+
+    def extend(self, records):
+        for record in records:
+            self.add(record)
+        return self
+
+    def context_clues(self):
+        return self.context.clues()
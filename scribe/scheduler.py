@@ -0,0 +1,377 @@
+import random
+import re
+import threading
+import time
+
+from .config import get_rate_limits
+from .summarize import estimate_tokens
+
+# HTTP statuses worth retrying; anything else (bad request, auth) fails at once
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# OpenAI client errors that have no HTTP status but are transient
+RETRYABLE_ERRORS = ("APIConnectionError", "APITimeoutError")
+
+# Ceiling for the adaptive concurrency limit; callers cap it further
+MAX_ADAPTIVE_CONCURRENCY = 64
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider that keeps failing"""
+
+
+class TokenBucket:
+    """
+    Per-minute budget of requests or tokens
+
+    `reserve` takes from the bucket and returns how long the caller must
+    wait before sending, so it works for both blocking and async callers.
+    A rate of 0 means unlimited.
+    """
+
+    def __init__(self, per_minute=0):
+        self.lock = threading.Lock()
+        self.per_minute = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def set_rate(self, per_minute):
+        with self.lock:
+            if not self.per_minute:
+                self.level = per_minute
+            self.per_minute = per_minute
+            self.level = min(self.level, per_minute)
+
+    def sync(self, remaining):
+        """Never assume more budget than the provider says is left"""
+        with self.lock:
+            if self.per_minute:
+                self._refill()
+                self.level = min(self.level, remaining)
+
+    def reserve(self, amount=1):
+        if not self.per_minute:
+            return 0.0
+        with self.lock:
+            self._refill()
+            # A request larger than the whole bucket still goes through once it is full
+            self.level -= min(amount, self.per_minute)
+            if self.level >= 0:
+                return 0.0
+            return -self.level * 60 / self.per_minute
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.per_minute, self.level + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+
+class RequestScheduler:
+    """
+    Rate limiting, retries and a circuit breaker around chat completion calls
+
+    One scheduler is shared by every generator for a provider (see
+    get_scheduler). It keeps requests and estimated tokens within per-minute
+    buckets, learning the limits from x-ratelimit-* headers when they are
+    not configured, lowers its concurrency limit when throttled and raises
+    it again as requests succeed, and retries transient failures with
+    jittered exponential backoff, honouring Retry-After. After
+    `failure_threshold` consecutive server or connection failures it stops
+    calling the provider for `cooldown` seconds.
+    """
+
+    def __init__(self, rpm=0, tpm=0, max_retries=5, base_delay=1.0, max_delay=60.0,
+                 failure_threshold=5, cooldown=30.0, name="provider"):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.fixed_rpm = bool(rpm)
+        self.fixed_tpm = bool(tpm)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        # Reentrant, as a stream dropped unread can release its slot while
+        # being garbage collected on a thread that already holds the lock
+        self.lock = threading.RLock()
+        # Requests wait here for a slot under the adaptive limit; async callers
+        # park a future in async_waiters instead of blocking their event loop
+        self.slot_free = threading.Condition(self.lock)
+        self.async_waiters = []
+        self.limit = MAX_ADAPTIVE_CONCURRENCY
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.failures = 0
+        self.opened_at = None
+
+        self.retries = 0
+        self.throttled = 0
+
+    def call(self, create, **request):
+        """
+        Send a request through `create` (a `with_raw_response.create`), retrying transient errors
+
+        Returns the parsed response. Streams are only retried if opening
+        them fails, never once text has started arriving, and keep their
+        concurrency slot until they are exhausted or closed.
+        """
+        tokens = self._estimate(request)
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit()
+            self._acquire_slot()
+            try:
+                time.sleep(self._reserve(tokens))
+                raw = create(**request)
+            except Exception as e:
+                self._release_slot()
+                error = e
+            except BaseException:
+                self._release_slot()
+                raise
+            else:
+                return self._take_response(raw, request.get("stream"))
+
+            delay = self._on_error(error, attempt)
+            if delay is None:
+                raise error
+            time.sleep(delay)
+
+    def _take_response(self, raw, stream):
+        """Parse a successful response, holding a stream's slot until its body has been read"""
+        try:
+            self._on_success(raw.headers)
+            response = raw.parse()
+        except BaseException:
+            self._release_slot()
+            raise
+        if not stream:
+            self._release_slot()
+            return response
+        return _HeldStream(response, self._release_slot)
+
+    async def call_async(self, create, **request):
+        """Async counterpart of `call`"""
+        import asyncio
+
+        tokens = self._estimate(request)
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit()
+            await self._acquire_slot_async()
+            try:
+                await asyncio.sleep(self._reserve(tokens))
+                raw = await create(**request)
+            except Exception as e:
+                error = e
+            else:
+                error = None
+            finally:
+                self._release_slot()
+
+            if error is None:
+                self._on_success(raw.headers)
+                return raw.parse()
+            delay = self._on_error(error, attempt)
+            if delay is None:
+                raise error
+            await asyncio.sleep(delay)
+
+    def _acquire_slot(self):
+        """Block until a request fits under the adaptive concurrency limit, then count it"""
+        with self.slot_free:
+            while self.in_flight >= self.limit:
+                self.slot_free.wait()
+            self.in_flight += 1
+
+    async def _acquire_slot_async(self):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.lock:
+                if self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self.async_waiters.append((loop, waiter))
+            await waiter
+
+    def _release_slot(self):
+        with self.lock:
+            self.in_flight -= 1
+            self.slot_free.notify()
+            # Async waiters may live on other threads' loops; each rechecks the limit
+            waiters, self.async_waiters = self.async_waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    @staticmethod
+    def _estimate(request):
+        # Providers count max_tokens against the tokens-per-minute limit up front
+        prompt = "".join(message["content"] for message in request.get("messages", []))
+        return estimate_tokens(prompt) + request.get("max_tokens", 0)
+
+    def _reserve(self, tokens):
+        pause = self.paused_until - time.monotonic()
+        return max(pause, self.requests.reserve(1), self.tokens.reserve(tokens), 0.0)
+
+    def _check_circuit(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            remaining = self.cooldown - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"{self.name} failed {self.failures} times in a row; "
+                    f"not calling it again for {remaining:.0f}s"
+                )
+            # Half-open: let requests through, but the next failure reopens it
+            self.opened_at = None
+            self.failures = self.failure_threshold - 1
+
+    def _on_success(self, headers):
+        with self.lock:
+            self.failures = 0
+            # Additive increase: about +1 per `limit` successful requests
+            self.limit = min(MAX_ADAPTIVE_CONCURRENCY, self.limit + 1 / self.limit)
+        self._sync_headers(headers)
+
+    def _on_error(self, error, attempt):
+        """Return how long to wait before retrying, or None if the error should be raised"""
+        status = getattr(error, "status_code", None)
+        if status not in RETRYABLE_STATUS and type(error).__name__ not in RETRYABLE_ERRORS:
+            return None
+        if getattr(error, "code", None) == "insufficient_quota":
+            # Out of credit is reported as a 429 but waiting won't fix it
+            return None
+
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        wait = _retry_after(headers)
+        with self.lock:
+            if status == 429:
+                # Multiplicative decrease, from what was actually in flight
+                self.throttled += 1
+                self.limit = max(1, min(self.limit, self.in_flight + 1) / 2)
+                if wait:
+                    self.paused_until = max(self.paused_until, time.monotonic() + wait)
+            else:
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    self.opened_at = time.monotonic()
+                    return None
+            if attempt >= self.max_retries:
+                return None
+            self.retries += 1
+        self._sync_headers(headers)
+
+        # Full jitter, so throttled requests don't all come back at once
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(wait or 0, backoff)
+
+    def _sync_headers(self, headers):
+        for name, bucket, fixed in (
+            ("requests", self.requests, self.fixed_rpm),
+            ("tokens", self.tokens, self.fixed_tpm),
+        ):
+            limit = _number(headers.get(f"x-ratelimit-limit-{name}"))
+            if limit and not fixed and limit != bucket.per_minute:
+                bucket.set_rate(limit)
+            remaining = _number(headers.get(f"x-ratelimit-remaining-{name}"))
+            if remaining is not None:
+                bucket.sync(remaining)
+            if remaining == 0:
+                reset = _parse_duration(headers.get(f"x-ratelimit-reset-{name}"))
+                if reset:
+                    with self.lock:
+                        self.paused_until = max(self.paused_until, time.monotonic() + reset)
+
+
+class _HeldStream:
+    """
+    A streamed response that holds its request's concurrency slot
+
+    The slot is released once the stream is exhausted, fails or is closed,
+    rather than when its headers arrive. Other attributes are the stream's.
+    """
+
+    def __init__(self, stream, release):
+        self.stream = stream
+        self._release = release
+
+    def __iter__(self):
+        try:
+            for chunk in self.stream:
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        release, self._release = self._release, None
+        if release is None:
+            return
+        release()
+        close = getattr(self.stream, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_schedulers = {}
+
+
+def get_scheduler(provider="deepseek"):
+    """Return the process-wide scheduler for a provider, so all its requests share one budget"""
+    if provider not in _schedulers:
+        rpm, tpm, max_retries = get_rate_limits(provider)
+        _schedulers[provider] = RequestScheduler(rpm, tpm, max_retries, name=provider)
+    return _schedulers[provider]
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_after(headers):
+    """Seconds from a Retry-After (or retry-after-ms) header, or None"""
+    milliseconds = _number(headers.get("retry-after-ms"))
+    if milliseconds is not None:
+        return milliseconds / 1000
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    seconds = _number(value)
+    if seconds is not None:
+        return seconds
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_duration(value):
+    """Parse reset durations such as "1s", "6m0s" or "250ms" into seconds"""
+    if not value:
+        return None
+    units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return _number(value)
+    return sum(float(amount) * units[unit] for amount, unit in parts)
@@ -0,0 +1,264 @@
+"""
+`scribe serve`: a long-lived daemon that runs `scribe` commands for thin clients
+
+Each request runs the normal pipeline in a thread of this process, so
+imports, .env parsing, opened repositories and the AI providers' keep-alive
+connections are paid for once rather than on every call. A request's output
+is routed back to the client that sent it as it is printed, and identical
+requests arriving while one is running share its run.
+"""
+import json
+import os
+import secrets
+import socketserver
+import sys
+import threading
+
+from .cli import Spinner, build_parser, execute
+from .client import connect, parse_address, token_path
+from .git_parser import GitParser
+from .tweet_gen import TweetGenerator
+
+# Per request thread: the job being run and the parser locks it holds
+_local = threading.local()
+
+
+class _Router:
+    """Stand-in for sys.stdout/sys.stderr that sends each request thread's output to its job"""
+
+    def __init__(self, name, fallback):
+        self.name = name
+        self.fallback = fallback
+
+    def write(self, text):
+        job = getattr(_local, "job", None)
+        if job is None:
+            return self.fallback.write(text)
+        job.emit(self.name, text)
+        return len(text)
+
+    def flush(self):
+        if getattr(_local, "job", None) is None:
+            self.fallback.flush()
+
+    def isatty(self):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+
+class _Job:
+    """Output of one running command; every client that asked for it follows along"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.messages = []
+        self.exit_code = None
+
+    def emit(self, stream, text):
+        with self.condition:
+            self.messages.append({stream: text})
+            self.condition.notify_all()
+
+    def finish(self, exit_code):
+        with self.condition:
+            self.exit_code = exit_code
+            self.condition.notify_all()
+
+    def follow(self):
+        """Yield the job's output messages from the start, then {"exit": code}"""
+        sent = 0
+        while True:
+            with self.condition:
+                while sent == len(self.messages) and self.exit_code is None:
+                    self.condition.wait()
+                messages = self.messages[sent:]
+                sent = len(self.messages)
+                exit_code = self.exit_code
+            for message in messages:
+                yield message
+            if exit_code is not None:
+                yield {"exit": exit_code}
+                return
+
+
+class WarmPool:
+    """
+    Repositories and AI clients kept open between requests
+
+    GitParsers (with their git.Repo and commit cache connection) are reused
+    per repository path, by one request at a time: a request holds its
+    parser's lock until it has read the commits (see cli.run). OpenAI
+    clients are shared per provider so their pooled HTTP connections stay
+    open between requests.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.parsers = {}
+        self.clients = {}
+
+    def git_parser(self, repo_path, backend="log", cache=False, metrics=None):
+        key = (os.path.abspath(repo_path), backend, cache)
+        with self.lock:
+            entry = self.parsers.setdefault(key, [None, threading.Lock()])
+
+        entry[1].acquire()
+        _local.__dict__.setdefault("held", []).append(entry[1])
+        if entry[0] is None:
+            entry[0] = GitParser(repo_path, backend=backend, cache=cache)
+
+        parser = entry[0]
+        parser.metrics = metrics
+        if parser.cache is not None:
+            parser.cache.hits = parser.cache.misses = 0
+        return parser
+
+    def tweet_generator(self, provider="deepseek", cache=False, fresh=False, metrics=None):
+        generator = TweetGenerator(
+            provider=provider, cache=cache, fresh=fresh, metrics=metrics, client=self.clients.get(provider)
+        )
+        with self.lock:
+            self.clients.setdefault(provider, generator.client)
+        return generator
+
+    def release(self):
+        """Let other requests use the parsers this request thread was holding"""
+        held = _local.__dict__.get("held", [])
+        while held:
+            held.pop().release()
+
+
+class ScribeServer:
+    """Runs requested commands against a WarmPool, one thread per distinct command"""
+
+    def __init__(self):
+        self.pool = WarmPool()
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+    def submit(self, argv, cwd):
+        """Start a job for `scribe <argv>` in `cwd`, or join the identical one already running"""
+        key = json.dumps([cwd, argv])
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is None:
+                job = self.jobs[key] = _Job()
+                threading.Thread(target=self._run, args=(key, job, argv, cwd), daemon=True).start()
+        return job
+
+    def _run(self, key, job, argv, cwd):
+        _local.job = job
+        exit_code = 0
+        try:
+            args = build_parser().parse_args(argv)
+            _resolve_paths(args, cwd)
+            execute(args, self.pool)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            self.pool.release()
+            with self.lock:
+                del self.jobs[key]
+            _local.job = None
+            job.finish(exit_code)
+
+
+def _resolve_paths(args, cwd):
+    """Make the client's relative paths relative to its working directory, not the server's"""
+    if args.repo:
+        args.repo = [os.path.join(cwd, path) for path in args.repo]
+    elif not args.workspace:
+        # Where cli.run would fall back to ".", which must be the client's directory
+        args.repo = [cwd]
+    for name in ("workspace", "metrics_json", "cprofile"):
+        if getattr(args, name):
+            setattr(args, name, os.path.join(cwd, getattr(args, name)))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            argv, cwd = list(request["argv"]), request["cwd"]
+        except (ValueError, KeyError, TypeError):
+            return
+        if self.server.token and not secrets.compare_digest(str(request.get("token", "")), self.server.token):
+            self._send({"stderr": "❌ Error: Wrong or missing server token\n"})
+            self._send({"exit": 1})
+            return
+
+        try:
+            for message in self.server.scribe.submit(argv, cwd).follow():
+                self._send(message)
+        except OSError:
+            # The client went away; the job still finishes for anyone else following it
+            pass
+
+    def _send(self, message):
+        self.wfile.write(json.dumps(message).encode() + b"\n")
+
+
+def _remove_stale_socket(path):
+    if not os.path.exists(path):
+        return
+    try:
+        connect(path).close()
+    except OSError:
+        os.unlink(path)
+    else:
+        raise ValueError(f"A Scribe server is already listening on {path}")
+
+
+def serve(address):
+    """Listen on `address` (a Unix socket path or host:port) until interrupted"""
+    kind, target = parse_address(address)
+    if kind == "unix":
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        _remove_stale_socket(target)
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        server = Server(target, _Handler)
+        os.chmod(target, 0o600)
+        server.token = None
+    else:
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        server = Server(target, _Handler)
+        # Any local user can reach a TCP port, so clients must show the owner's token
+        server.token = secrets.token_hex(16)
+        path = token_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(server.token)
+    server.scribe = ScribeServer()
+
+    # Pay for the slow imports now rather than on the first request
+    import git  # noqa: F401
+    import openai  # noqa: F401
+
+    Spinner.enabled = False
+    sys.stdout = _Router("stdout", sys.stdout)
+    sys.stderr = _Router("stderr", sys.stderr)
+
+    print(f"🚀 Scribe server listening on {address}")
+    print(f"   Point the CLI at it with: export SCRIBE_SERVER={address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Scribe server stopped")
+    finally:
+        server.server_close()
+        if kind == "unix" and os.path.exists(target):
+            os.unlink(target)
+        if server.token:
+            token_path().unlink()
@@ -0,0 +1,103 @@
+import math
+
+from .git_parser import GitParser
+
+# Rough chars-per-token ratio for English prose and code with BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+# Reduce rounds after which merged summaries are truncated instead
+MAX_REDUCE_ROUNDS = 3
+
+
+def estimate_tokens(text):
+    """Cheap local token estimate (no tokenizer download or API call)"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def chunk_commits(commits, budget):
+    """Split commits into consecutive chunks whose formatted text fits `budget` tokens"""
+    chunks = []
+    current = []
+    used = 0
+    for i, commit in enumerate(commits, 1):
+        cost = estimate_tokens("\n".join(GitParser.format_commit(i, commit)))
+        if current and used + cost > budget:
+            chunks.append(current)
+            current = []
+            used = 0
+        current.append(commit)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _group_texts(texts, budget):
+    """Pack summary texts into groups whose combined size fits `budget` tokens"""
+    groups = []
+    current = []
+    used = 0
+    for text in texts:
+        cost = estimate_tokens(text)
+        if current and used + cost > budget:
+            groups.append(current)
+            current = []
+            used = 0
+        current.append(text)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _truncate(text, budget):
+    return text[:budget * CHARS_PER_TOKEN]
+
+
+def build_commits_text(commits, generator, budget, max_concurrency=4, context_clues=None):
+    """
+    Format commits for the tweet prompt, summarizing them first if they are too large
+
+    Commits that fit `budget` are formatted exactly as before. Otherwise they
+    are split into chunks under the budget, each chunk is summarized
+    concurrently, and the summaries are reduced again until they fit.
+
+    `context_clues` can be passed in when they were already inferred while
+    streaming the commits (see CommitDigest).
+
+    Returns:
+        (commits_text, number of chunks summarized; 0 if none were needed)
+    """
+    if context_clues is None:
+        context_clues = GitParser._infer_project_context(commits)
+
+    commits_text = GitParser.format_commits_for_ai(commits, context_clues)
+    if estimate_tokens(commits_text) <= budget:
+        return commits_text, 0
+
+    chunks = chunk_commits(commits, budget)
+    chunk_texts = [
+        _truncate(GitParser.format_commits_for_ai(chunk, context_clues), budget)
+        for chunk in chunks
+    ]
+    summaries = generator.summarize_chunks(chunk_texts, max_concurrency=max_concurrency)
+
+    for _ in range(MAX_REDUCE_ROUNDS):
+        if estimate_tokens("\n\n".join(summaries)) <= budget or len(summaries) == 1:
+            break
+        groups = _group_texts(summaries, budget)
+        if len(groups) == len(summaries):
+            break
+        summaries = generator.summarize_chunks(
+            [_truncate("\n\n".join(group), budget) for group in groups],
+            max_concurrency=max_concurrency
+        )
+
+    text_parts = []
+    if context_clues:
+        text_parts.append(f"PROJECT CONTEXT (inferred from files): {', '.join(context_clues)}\n")
+    text_parts.append(f"COMMIT SUMMARIES ({len(commits)} commits, summarized in {len(chunks)} batches):\n")
+    for i, summary in enumerate(summaries, 1):
+        text_parts.append(f"\nBatch {i}:\n{summary}")
+
+    return _truncate("\n".join(text_parts), budget), len(chunks)
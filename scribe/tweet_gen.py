@@ -1,55 +1,40 @@
-from openai import OpenAI
+import json
+import time
+
+from .cache import ResponseCache
 from .config import get_api_key, get_base_url, get_model
+from .metrics import Metrics
+from .scheduler import get_scheduler
 
+STYLES = ("technical", "casual", "celebratory")
 
-class TweetGenerator:
-    def __init__(self, provider="deepseek"):
-        """Initialize tweet generator with specified provider"""
-        self.provider = provider
-        self.api_key = get_api_key(provider)
-        self.base_url = get_base_url(provider)
-        self.model = get_model(provider)
+# Tweets longer than this are sent back to be shortened
+TWEET_MAX_CHARS = 260
 
-        # Initialize OpenAI client (works for both OpenAI and DeepSeek)
-        if self.base_url:
-            self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
-        else:
-            self.client = OpenAI(api_key=self.api_key)
+# Follow-up rounds for over-length or missing tweets before giving up
+MAX_REPAIR_ROUNDS = 2
 
-    def generate_tweets(self, commits_text, style="technical", num_options=3):
-        """
-        Generate tweet options from commits
+_json_decoder = json.JSONDecoder()
 
-        Args:
-            commits_text: Formatted commits text
-            style: Tweet style (technical, casual, celebratory)
-            num_options: Number of tweet options to generate
+STYLE_PROMPTS = {
+    "technical": "Technical but accessible - explain what was built and why it matters",
+    "casual": "Conversational and story-driven - share the journey and learnings",
+    "celebratory": "Enthusiastic and milestone-focused - highlight wins and progress"
+}
 
-        Returns:
-            List of tweet text options
-        """
-        style_prompts = {
-            "technical": "Technical but accessible - explain what was built and why it matters",
-            "casual": "Conversational and story-driven - share the journey and learnings",
-            "celebratory": "Enthusiastic and milestone-focused - highlight wins and progress"
-        }
-
-        style_instruction = style_prompts.get(style, style_prompts["technical"])
-
-        prompt = f"""You are a developer building in public on Twitter/X. Your audience wants to follow your JOURNEY, not just see a changelog.
+# System prompts hold everything that never changes between requests, so the
+# request starts with the same bytes every time and providers' prompt caches
+# (DeepSeek context caching, OpenAI prompt caching) can reuse it. Commits,
+# style and counts only appear in the user message that follows.
+TWEETS_SYSTEM_PROMPT = """You are a developer building in public on Twitter/X, turning git commits into engaging tweets. Your audience wants to follow your JOURNEY, not just see a changelog.
 
-Analyze these git commits and generate {num_options} engaging tweet options for the #buildinpublic community:
-
-COMMITS:
-{commits_text}
+The user message holds git commits, a style and the number of tweet options to generate for the #buildinpublic community.
 
 TWEET FORMULA - Use this structure:
 1. START with what you're building (the product/vision) - NOT technical details
 2. TODAY'S PROGRESS - Specific wins framed as user value or business impact
 3. INSIGHT or next step - What you learned or what's next
 
-STYLE: {style_instruction}
-
 GOOD EXAMPLES (all under 260 chars):
 ✓ "Building a legal case tool. Shipped a client portal today - lawyers can share updates in real-time. No more 'what's my status?' calls. Notifications next 🚀" (157 chars)
 
@@ -71,46 +56,11 @@ REQUIREMENTS:
 - Emojis are fine but don't overdo it (1-2 max)
 - Avoid generic words like "updated", "improved", "fixed" without context
 
-Generate {num_options} different tweet options, each on its own line, numbered 1., 2., 3., etc.
-"""
-
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that turns git commits into engaging tweets for developers."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.8,
-                max_tokens=1000
-            )
-
-            # Parse response into individual tweets
-            response_text = response.choices[0].message.content.strip()
-            tweets = []
-
-            for line in response_text.split('\n'):
-                line = line.strip()
-                # Remove numbering like "1.", "2.", etc.
-                if line and (line[0].isdigit() or line.startswith('-')):
-                    # Strip leading number/bullet and period/dash
-                    tweet = line.lstrip('0123456789.-) ').strip()
-                    if tweet:
-                        tweets.append(tweet)
-
-            return tweets if tweets else [response_text]
-
-        except Exception as e:
-            raise Exception(f"Error generating tweets: {str(e)}")
+Reply with JSON only, in the form {"tweets": ["first option", "second option", ...]}"""
 
-    def generate_thread(self, commits_text):
-        """Generate a tweet thread for more detailed updates"""
-        prompt = f"""You are a developer building in public on Twitter/X. Create a tweet thread that tells the STORY of today's work.
+THREAD_SYSTEM_PROMPT = """You are a developer building in public on Twitter/X, turning git commits into engaging tweet threads. Create a tweet thread that tells the STORY of today's work for the #buildinpublic community.
 
-Analyze these git commits and create an engaging thread for the #buildinpublic community:
-
-COMMITS:
-{commits_text}
+The user message holds the git commits to write about.
 
 THREAD STRUCTURE:
 Tweet 1 (HOOK): What you're building + today's big win. Make people want to read more.
@@ -140,32 +90,578 @@ REQUIREMENTS:
 - 2-4 tweets depending on content
 - End with what's next or a key insight
 
-Generate the thread with each tweet on its own line, numbered 1., 2., 3., etc.
-"""
+Reply with JSON only, with the thread's tweets in order, in the form {"tweets": ["first tweet", "second tweet", ...]}"""
+
+SUMMARY_SYSTEM_PROMPT = """You condense git history into concise notes. Summarize the git commit history in the user message for someone who will write a #buildinpublic update from it.
+
+- Keep concrete features, fixes, user-facing changes and notable numbers
+- Merge related commits and drop noise (typos, lint, merges, WIP)
+- Mention the project or repository when it is given
+- Use short bullet points, at most 12"""
+
+
+class TweetStreamParser:
+    """
+    Turn streamed completion text into tweets as soon as each one is complete
+
+    Handles JSON replies ({"tweets": ["...", ...]}), emitting each string
+    once its closing quote arrives, and falls back to numbered lines for
+    plain-text replies.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.buffer = ""
+        self.tweets = []
+        self.mode = None
+        self.pos = None
+
+    @classmethod
+    def parse(cls, response_text):
+        """Parse a complete response in one go"""
+        parser = cls()
+        parser.feed(response_text)
+        parser.close()
+        return parser.tweets
+
+    def feed(self, chunk):
+        """Add streamed text and return the tweets that just completed"""
+        self.text += chunk
+        if self.mode is None:
+            stripped = self.text.lstrip()
+            if not stripped:
+                return []
+            self.mode = "json" if stripped[0] in "{[" else "lines"
+            chunk = self.text
+        if self.mode == "json":
+            return self._take_json()
+        self.buffer += chunk
+        *lines, self.buffer = self.buffer.split('\n')
+        return self._take(lines)
+
+    def close(self):
+        """Flush what is left, falling back to numbered lines, then the whole response"""
+        if self.mode == "json":
+            new_tweets = self._take_json()
+            if not self.tweets:
+                new_tweets = self._take(self.text.split('\n'))
+            return new_tweets
+
+        new_tweets = self._take([self.buffer])
+        self.buffer = ""
+        if not self.tweets and self.text.strip():
+            self.tweets = [self.text.strip()]
+            new_tweets = list(self.tweets)
+        return new_tweets
+
+    def _take_json(self):
+        # Read string items of the first JSON array, stopping at an incomplete one
+        text = self.text
+        if self.pos is None:
+            start = text.find("[")
+            if start < 0:
+                return []
+            self.pos = start + 1
+
+        new_tweets = []
+        pos = self.pos
+        while True:
+            while pos < len(text) and text[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(text) or text[pos] != '"':
+                break
+            try:
+                tweet, pos = _json_decoder.raw_decode(text, pos)
+            except ValueError:
+                break
+            self.pos = pos
+            if tweet.strip():
+                new_tweets.append(tweet.strip())
+        self.tweets.extend(new_tweets)
+        return new_tweets
+
+    def _take(self, lines):
+        new_tweets = []
+        for line in lines:
+            line = line.strip()
+            # Remove numbering like "1.", "2.", etc.
+            if line and (line[0].isdigit() or line.startswith('-')):
+                # Strip leading number/bullet and period/dash
+                tweet = line.lstrip('0123456789.-) ').strip()
+                if tweet:
+                    new_tweets.append(tweet)
+        self.tweets.extend(new_tweets)
+        return new_tweets
 
-        try:
-            response = self.client.chat.completions.create(
+
+class TweetGenerator:
+    def __init__(self, provider="deepseek", cache=False, fresh=False, metrics=None, client=None):
+        """
+        Initialize tweet generator with specified provider
+
+        Args:
+            provider: AI provider name
+            cache: Reuse identical completions from the on-disk response cache
+            fresh: Skip cache lookups (new responses are still stored)
+            metrics: Metrics that request timings and token usage are added to
+            client: OpenAI client to reuse, keeping its pooled connections
+                warm (see scribe.server); one is created if not given
+        """
+        self.provider = provider
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.cache = ResponseCache() if cache else None
+        self.fresh = fresh
+        self.api_key = get_api_key(provider)
+        self.base_url = get_base_url(provider)
+        self.model = get_model(provider)
+        self.scheduler = get_scheduler(provider)
+
+        # Initialize OpenAI client (works for both OpenAI and DeepSeek).
+        # Retries are left to the scheduler so they share its rate limits.
+        self.client_kwargs = {"api_key": self.api_key, "max_retries": 0}
+        if self.base_url:
+            self.client_kwargs["base_url"] = self.base_url
+        if client is None:
+            # openai pulls in httpx and pydantic, so it is imported on first use
+            from openai import OpenAI
+            client = OpenAI(**self.client_kwargs)
+        self.client = client
+
+    def _cache_key(self, messages, temperature, max_tokens, response_format=None):
+        return ResponseCache.make_key(
+            provider=self.provider,
+            base_url=self.base_url,
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+        )
+
+    def _complete(self, messages, temperature, max_tokens, response_format=None, on_delta=None,
+                  validate=None, fresh=False):
+        """
+        Run a chat completion, going through the response cache when enabled
+
+        When `on_delta` is given the completion is streamed and each text
+        delta is passed to it as it arrives (a cache hit arrives as one delta).
+        Only responses that pass `validate` (if given) are cached, and
+        `fresh` skips the cache lookup for this request.
+        """
+        # Only sent when set; not every OpenAI-compatible API accepts a null
+        extra = {"response_format": response_format} if response_format else {}
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(messages, temperature, max_tokens, response_format)
+            if not (self.fresh or fresh):
+                cached = self.cache.get(key)
+                if cached is not None:
+                    self.metrics.count("response_cache_hits")
+                    if on_delta:
+                        on_delta(cached)
+                    return cached
+
+        start = time.perf_counter()
+        if on_delta:
+            stream = self.scheduler.call(
+                self.client.chat.completions.with_raw_response.create,
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that turns git commits into engaging tweet threads."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.8,
-                max_tokens=1500
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                # The final chunk then carries token usage (with no choices)
+                stream_options={"include_usage": True},
+                **extra
             )
-
-            # Parse response into individual tweets
+            parts = []
+            # Closing the stream frees its scheduler slot even if on_delta raises
+            with stream:
+                for chunk in stream:
+                    if getattr(chunk, "usage", None):
+                        self.metrics.record_usage(chunk.usage)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if not parts:
+                            self.metrics.set_time("time_to_first_token", time.perf_counter() - start)
+                        parts.append(delta)
+                        on_delta(delta)
+            response_text = "".join(parts).strip()
+        else:
+            response = self.scheduler.call(
+                self.client.chat.completions.with_raw_response.create,
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **extra
+            )
+            self.metrics.record_usage(response.usage)
             response_text = response.choices[0].message.content.strip()
-            tweets = []
+        # Streamed requests include the time spent in on_delta
+        self.metrics.add_time("api_request", time.perf_counter() - start)
+
+        if key is not None and (validate is None or validate(response_text)):
+            self.cache.put(key, response_text)
+        return response_text
+
+    async def _complete_async(self, client, messages, temperature, max_tokens, response_format=None,
+                              validate=None, fresh=False):
+        """Async counterpart of `_complete` (no streaming) for concurrent generation"""
+        extra = {"response_format": response_format} if response_format else {}
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(messages, temperature, max_tokens, response_format)
+            if not (self.fresh or fresh):
+                cached = self.cache.get(key)
+                if cached is not None:
+                    self.metrics.count("response_cache_hits")
+                    return cached
+
+        response = await self.scheduler.call_async(
+            client.chat.completions.with_raw_response.create,
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **extra
+        )
+        self.metrics.record_usage(response.usage)
+        response_text = response.choices[0].message.content.strip()
+
+        if key is not None and (validate is None or validate(response_text)):
+            self.cache.put(key, response_text)
+        return response_text
+
+    def _complete_tweets(self, request, count=None, ordered=False, on_tweet=None):
+        """
+        Run a tweets request, then fix only the failing tweets with small follow-up requests
+
+        Args:
+            request: Chat request from _tweets_request or _thread_request
+            count: Number of tweets wanted (None for a thread)
+            ordered: Tweets must be passed on in order (threads)
+            on_tweet: Optional callback; when set the response is streamed and
+                each tweet that passes validation is passed on as it completes
+                (for ordered tweets, only up to the first one being fixed),
+                the rest once they have been repaired
 
-            for line in response_text.split('\n'):
-                line = line.strip()
-                if line and (line[0].isdigit() or line.startswith('-')):
-                    tweet = line.lstrip('0123456789.-) ').strip()
-                    if tweet:
-                        tweets.append(tweet)
+        Returns:
+            List of tweets
+        """
+        if not on_tweet:
+            tweets = self._parse_tweets(self._complete(validate=self._has_tweets, **request), count)
+        else:
+            parser = TweetStreamParser()
+            emitted = set()
+            clock = time.perf_counter
+
+            def show_ready():
+                for i, tweet in enumerate(parser.tweets[:count] if count else parser.tweets):
+                    if i in emitted:
+                        continue
+                    if len(tweet) > TWEET_MAX_CHARS:
+                        if ordered:
+                            break
+                        continue
+                    emitted.add(i)
+                    on_tweet(tweet)
+
+            def on_delta(delta):
+                start = clock()
+                new_tweets = parser.feed(delta)
+                self.metrics.add_time("parse_tweets", clock() - start)
+                if new_tweets:
+                    show_ready()
+
+            self._complete(on_delta=on_delta, validate=self._has_tweets, **request)
+            parser.close()
+            show_ready()
+            tweets = parser.tweets[:count] if count else parser.tweets
+
+        for _ in range(MAX_REPAIR_ROUNDS):
+            plan = self._repair_plan(tweets, count, request)
+            if plan is None:
+                break
+            repair_request, too_long, missing = plan
+            fixed = self._parse_tweets(self._complete(validate=self._has_tweets, **repair_request))
+            tweets = self._apply_repair(tweets, fixed, too_long, missing, count)
+
+        if on_tweet:
+            for i, tweet in enumerate(tweets):
+                if i not in emitted:
+                    on_tweet(tweet)
+        return tweets
+
+    async def _complete_tweets_async(self, client, request, count=None):
+        """Async counterpart of `_complete_tweets` (no streaming)"""
+        tweets = self._parse_tweets(await self._complete_async(client, validate=self._has_tweets, **request), count)
+        for _ in range(MAX_REPAIR_ROUNDS):
+            plan = self._repair_plan(tweets, count, request)
+            if plan is None:
+                break
+            repair_request, too_long, missing = plan
+            fixed = self._parse_tweets(await self._complete_async(client, validate=self._has_tweets, **repair_request))
+            tweets = self._apply_repair(tweets, fixed, too_long, missing, count)
+        return tweets
+
+    def _parse_tweets(self, response_text, count=None):
+        with self.metrics.phase("parse_tweets"):
+            tweets = TweetStreamParser.parse(response_text)
+        return tweets[:count] if count else tweets
+
+    @staticmethod
+    def _has_tweets(response_text):
+        """Whether a reply is worth caching: anything less makes _repair_plan resend the request"""
+        return bool(TweetStreamParser.parse(response_text))
+
+    def _repair_plan(self, tweets, count, request):
+        """
+        Work out which tweets still fail validation
 
-            return tweets if tweets else [response_text]
+        Returns (follow-up request, indices of over-length tweets, number of
+        missing tweets), or None when every tweet is usable. Only when
+        nothing usable came back is the original request sent again,
+        bypassing the response cache.
+        """
+        if not tweets:
+            self.metrics.count("repair_requests")
+            return dict(request, fresh=True), [], 0
+        too_long = [i for i, tweet in enumerate(tweets) if len(tweet) > TWEET_MAX_CHARS]
+        missing = max(0, (count or 0) - len(tweets))
+        if not too_long and not missing:
+            return None
+        self.metrics.count("repair_requests")
+        return self._repair_request(tweets, too_long, missing), too_long, missing
+
+    @staticmethod
+    def _apply_repair(tweets, fixed, too_long, missing, count):
+        """Merge a follow-up reply: rewrites (in order) replace the over-length tweets, new ones are appended"""
+        if not tweets:
+            return fixed[:count] if count else fixed
+        tweets = list(tweets)
+        for i, tweet in zip(too_long, fixed):
+            if len(tweet) < len(tweets[i]):
+                tweets[i] = tweet
+        tweets.extend(fixed[len(too_long):len(too_long) + missing])
+        return tweets
+
+    def generate_tweets(self, commits_text, style="technical", num_options=3, on_tweet=None):
+        """
+        Generate tweet options from commits
+
+        Args:
+            commits_text: Formatted commits text
+            style: Tweet style (technical, casual, celebratory)
+            num_options: Number of tweet options to generate
+            on_tweet: Optional callback; when set the response is streamed
+                and each tweet is passed to it as soon as it is complete
 
+        Returns:
+            List of tweet text options
+        """
+        request = self._tweets_request(commits_text, style, num_options)
+
+        try:
+            return self._complete_tweets(request, count=num_options, on_tweet=on_tweet)
+        except Exception as e:
+            raise Exception(f"Error generating tweets: {str(e)}")
+
+    def generate_thread(self, commits_text, on_tweet=None):
+        """Generate a tweet thread for more detailed updates (streamed to `on_tweet` if given)"""
+        request = self._thread_request(commits_text)
+
+        try:
+            return self._complete_tweets(request, ordered=True, on_tweet=on_tweet)
         except Exception as e:
             raise Exception(f"Error generating thread: {str(e)}")
+
+    def generate_many(self, commits_text, styles=STYLES, num_options=3, thread=False, max_concurrency=4):
+        """
+        Generate several tweet sets from the same commits text concurrently
+
+        Args:
+            commits_text: Formatted commits text
+            styles: Tweet styles to generate options for
+            num_options: Number of tweet options per style
+            thread: Also generate a tweet thread
+            max_concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            Dict mapping each style (and "thread", if requested) to its tweets
+        """
+        jobs = [
+            (style, self._tweets_job(self._tweets_request(commits_text, style, num_options), num_options))
+            for style in styles
+        ]
+        if thread:
+            jobs.append(("thread", self._tweets_job(self._thread_request(commits_text))))
+
+        return self._run_jobs(jobs, max_concurrency)
+
+    def generate_each(self, commits_texts, style="technical", num_options=3, thread=False,
+                      max_concurrency=4, on_result=None):
+        """
+        Generate tweets (or a thread) for several commits texts concurrently
+
+        Args:
+            commits_texts: (label, formatted commits text) pairs
+            style: Tweet style for every label
+            num_options: Number of tweet options per label
+            thread: Generate a thread per label instead of tweet options
+            max_concurrency: Maximum number of requests in flight at once
+            on_result: Optional callback called with (label, tweets) in input
+                order, each as soon as it and every earlier label are done
+
+        Returns:
+            Dict mapping each label to its tweets
+        """
+        if thread:
+            jobs = [(label, self._tweets_job(self._thread_request(text))) for label, text in commits_texts]
+        else:
+            jobs = [
+                (label, self._tweets_job(self._tweets_request(text, style, num_options), num_options))
+                for label, text in commits_texts
+            ]
+
+        return self._run_jobs(jobs, max_concurrency, on_result=on_result)
+
+    def summarize_chunks(self, chunk_texts, max_concurrency=4):
+        """Summarize chunks of formatted commits concurrently, returning one summary per chunk"""
+        jobs = [(f"summary {i}", self._text_job(self._summary_request(text))) for i, text in enumerate(chunk_texts, 1)]
+        responses = self._run_jobs(jobs, max_concurrency)
+        return list(responses.values())
+
+    def _tweets_job(self, request, count=None):
+        """Job for _run_jobs that returns validated (and, if needed, repaired) tweets"""
+        return lambda client: self._complete_tweets_async(client, request, count)
+
+    def _text_job(self, request):
+        """Job for _run_jobs that returns the response text"""
+        return lambda client: self._complete_async(client, **request)
+
+    def _run_jobs(self, jobs, max_concurrency, on_result=None):
+        # asyncio and the async client are only imported for concurrent runs
+        import asyncio
+        # Wall time for the whole batch; requests overlap, so it is not a per-request sum
+        with self.metrics.phase("api_concurrent"):
+            return asyncio.run(self._run_concurrently(jobs, max_concurrency, on_result))
+
+    async def _run_concurrently(self, jobs, max_concurrency, on_result=None):
+        """
+        Run (label, job) pairs under a concurrency limit, returning {label: result}
+
+        Each job is called with the async client and returns an awaitable
+        (see _tweets_job and _text_job). `on_result(label, result)` is called
+        in job order: a job that finishes early is held back until every
+        job before it has finished.
+        """
+        import asyncio
+        from openai import AsyncOpenAI
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        finished = {}
+        next_index = 0
+
+        async with AsyncOpenAI(**self.client_kwargs) as client:
+            async def run(index, label, job):
+                nonlocal next_index
+                async with semaphore:
+                    try:
+                        result = await job(client)
+                    except Exception as e:
+                        raise Exception(f"Error generating {label}: {str(e)}")
+
+                if on_result:
+                    finished[index] = result
+                    while next_index in finished:
+                        on_result(jobs[next_index][0], finished.pop(next_index))
+                        next_index += 1
+                return result
+
+            results = await asyncio.gather(*(run(i, label, job) for i, (label, job) in enumerate(jobs)))
+
+        return {label: result for (label, _), result in zip(jobs, results)}
+
+    def _tweets_request(self, commits_text, style, num_options):
+        """Build the chat request for single tweet options"""
+        style_instruction = STYLE_PROMPTS.get(style, STYLE_PROMPTS["technical"])
+
+        # The static instructions go first so providers can cache them as a prompt prefix
+        prompt = f"""COMMITS:
+{commits_text}
+
+STYLE: {style_instruction}
+
+Generate {num_options} different tweet options.
+"""
+
+        return dict(
+            messages=[
+                {"role": "system", "content": TWEETS_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.8,
+            max_tokens=1000,
+            response_format={"type": "json_object"}
+        )
+
+    def _thread_request(self, commits_text):
+        """Build the chat request for a tweet thread"""
+        prompt = f"""COMMITS:
+{commits_text}
+"""
+
+        return dict(
+            messages=[
+                {"role": "system", "content": THREAD_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.8,
+            max_tokens=1500,
+            response_format={"type": "json_object"}
+        )
+
+    def _repair_request(self, tweets, too_long, missing):
+        """Build the small follow-up request that rewrites over-length tweets and/or adds missing ones"""
+        parts = []
+        if too_long:
+            drafts = "\n".join(f"{n}. {tweets[i]}" for n, i in enumerate(too_long, 1))
+            parts.append(
+                f"Rewrite each of these {len(too_long)} tweet(s) so it is under {TWEET_MAX_CHARS} characters, "
+                f"keeping its meaning and voice, in the same order:\n{drafts}"
+            )
+        if missing:
+            accepted = "\n".join(f"- {tweet}" for i, tweet in enumerate(tweets) if i not in too_long)
+            parts.append(
+                f"{'Then write' if too_long else 'Write'} {missing} new tweet option(s) under {TWEET_MAX_CHARS} "
+                f"characters about the same work, different from these:\n{accepted}"
+            )
+        parts.append('Reply with JSON only, rewrites first, in the form {"tweets": ["...", ...]}')
+
+        return dict(
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that edits tweets for developers building in public."},
+                {"role": "user", "content": "\n\n".join(parts)}
+            ],
+            temperature=0.7,
+            max_tokens=600,
+            response_format={"type": "json_object"}
+        )
+
+    def _summary_request(self, chunk_text):
+        """Build the chat request that condenses one chunk of commits (or summaries)"""
+        prompt = f"""COMMITS:
+{chunk_text}
+"""
+
+        return dict(
+            messages=[
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,
+            max_tokens=600
+        )
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+
+class WatermarkStore:
+    """Per-repo record of the last commit Scribe processed, keyed by branch and author"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    @classmethod
+    def for_git_dir(cls, git_dir):
+        return cls(Path(git_dir) / "scribe" / "watermarks.json")
+
+    @staticmethod
+    def _key(branch, author):
+        # Git ref names can't contain ":", so this never collides
+        return f"{branch}:{(author or '').lower()}"
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, branch, author=None):
+        """Return {"sha", "tips", "date", "updated_at"} for this branch/author, or None"""
+        return self._load().get(self._key(branch, author))
+
+    def set(self, branch, author, tips, date):
+        """
+        Save a watermark, replacing the file atomically so readers never see a partial write
+
+        `tips` are the commit SHAs that were walked (one per branch); "sha" is
+        kept as the first of them for display.
+        """
+        watermarks = self._load()
+        watermarks[self._key(branch, author)] = {
+            "sha": tips[0] if tips else None,
+            "tips": list(tips),
+            "date": date,
+            "updated_at": time.time(),
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent), prefix=".watermarks-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(watermarks, f, indent=2)
+            os.replace(tmp_path, str(self.path))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -7,13 +7,13 @@ setup(
     author="Quaternion Studios",
     packages=find_packages(),
     install_requires=[
-        "openai>=1.0.0",
+        "openai>=1.26.0",
         "python-dotenv>=1.0.0",
         "gitpython>=3.1.0",
     ],
     entry_points={
         "console_scripts": [
-            "scribe=scribe.cli:main",
+            "scribe=scribe.client:main",
         ],
     },
     python_requires=">=3.8",